@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import bisect
+import glob
+import json
+import os
+
+import numpy as np
+
+from dep_parse import DepParse
+
+# 输出格式：conllu 为标准文本格式，shards 为可 mmap 随机访问的列式 .npy 分片
+OUTPUT_FORMATS = ("conllu", "shards")
+# 每个分片包含的句子数
+SHARD_SENTENCES = 10000
+# 分片中的列
+SHARD_COLUMNS = ("text", "token_offsets", "sent_ptr", "heads", "rel_ids", "pos_ids", "sent_text_offsets",
+                 "sent_text")
+
+
+def arcs_to_columns(n, arcs):
+    """(核心词, 依存关系, 依存词) 元组列表转换为按词排列的 heads、rels"""
+    heads = [0] * n
+    rels = ['_'] * n
+    for head, rel, dep in arcs:
+        heads[dep - 1] = head
+        rels[dep - 1] = rel
+    return heads, rels
+
+
+class ConlluWriter:
+    """逐句写出 CoNLL-U，词性写入 XPOS 列"""
+
+    def __init__(self, path):
+        self._file = open(path, 'w', encoding='utf-8')
+        self._count = 0
+
+    def write(self, sentence, words, pos, heads, rels):
+        self._count += 1
+        lines = [f"# sent_id = {self._count}", f"# text = {sentence}"]
+        for i, (word, tag, head, rel) in enumerate(zip(words, pos, heads, rels), 1):
+            lines.append(f"{i}\t{word}\t_\t_\t{tag or '_'}\t_\t{head}\t{rel or '_'}\t_\t_")
+        self._file.write('\n'.join(lines) + '\n\n')
+
+    def close(self):
+        self._file.close()
+
+
+def iter_conllu(path):
+    """流式读取 CoNLL-U，逐句产出 {sentence, words, pos, heads, rels}"""
+    sentence = None
+    words, pos, heads, rels = [], [], [], []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if line.startswith('# text = '):
+                sentence = line[len('# text = '):]
+            elif line.startswith('#'):
+                continue
+            elif line:
+                cols = line.split('\t')
+                if not cols[0].isdigit():  # 跳过多词符号和空节点
+                    continue
+                words.append(cols[1])
+                pos.append(cols[4])
+                heads.append(int(cols[6]))
+                rels.append(cols[7])
+            elif words:
+                yield {'sentence': sentence, 'words': words, 'pos': pos, 'heads': heads, 'rels': rels}
+                sentence = None
+                words, pos, heads, rels = [], [], [], []
+    if words:
+        yield {'sentence': sentence, 'words': words, 'pos': pos, 'heads': heads, 'rels': rels}
+
+
+class ShardWriter:
+    """把句子缓冲为列式分片，每满 shard_size 句写出一个 .npy 目录，内存只保留一个分片"""
+
+    def __init__(self, directory, shard_size=SHARD_SENTENCES):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.shard_size = shard_size
+        self._vocabs = {"rels": {}, "pos": {}}
+        self._shard = 0
+        self._reset()
+
+    def _reset(self):
+        self._words = []
+        self._sent_lens = []
+        self._sentences = []
+        self._heads = []
+        self._rel_ids = []
+        self._pos_ids = []
+
+    def _intern(self, kind, labels):
+        vocab = self._vocabs[kind]
+        return [vocab.setdefault(label, len(vocab)) for label in labels]
+
+    def write(self, sentence, words, pos, heads, rels):
+        self._words.extend(words)
+        self._sent_lens.append(len(words))
+        self._sentences.append(sentence)
+        self._heads.extend(heads)
+        self._rel_ids.extend(self._intern("rels", rels))
+        self._pos_ids.extend(self._intern("pos", pos))
+        if len(self._sent_lens) >= self.shard_size:
+            self._flush()
+
+    @staticmethod
+    def _pack(strings):
+        """字符串列表拼接为 UTF-8 字节数组与偏移量"""
+        encoded = [s.encode('utf-8') for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+    def _flush(self):
+        if not self._sent_lens:
+            return
+        text, token_offsets = self._pack(self._words)
+        sent_text, sent_text_offsets = self._pack(self._sentences)
+        sent_ptr = np.zeros(len(self._sent_lens) + 1, dtype=np.int64)
+        np.cumsum(self._sent_lens, out=sent_ptr[1:])
+        columns = {
+            "text": text,
+            "token_offsets": token_offsets,
+            "sent_ptr": sent_ptr,
+            "heads": np.asarray(self._heads, dtype=np.int32),
+            "rel_ids": np.asarray(self._rel_ids, dtype=np.int32),
+            "pos_ids": np.asarray(self._pos_ids, dtype=np.int32),
+            "sent_text": sent_text,
+            "sent_text_offsets": sent_text_offsets,
+        }
+        shard_dir = os.path.join(self.directory, f"shard_{self._shard:05d}")
+        os.makedirs(shard_dir, exist_ok=True)
+        for name, array in columns.items():
+            np.save(os.path.join(shard_dir, f"{name}.npy"), array)
+        self._shard += 1
+        self._reset()
+
+    def close(self):
+        self._flush()
+        vocab = {kind: sorted(ids, key=ids.get) for kind, ids in self._vocabs.items()}
+        with open(os.path.join(self.directory, "vocab.json"), 'w', encoding='utf-8') as f:
+            json.dump(vocab, f, ensure_ascii=False)
+
+
+class ShardReader:
+    """以 mmap 方式打开列式分片，按全局句子编号（从 0 开始）随机访问"""
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, "vocab.json"), 'r', encoding='utf-8') as f:
+            vocab = json.load(f)
+        self.rels = vocab["rels"]
+        self.pos = vocab["pos"]
+        self.shards = []
+        self._starts = []
+        total = 0
+        for shard_dir in sorted(glob.glob(os.path.join(directory, "shard_*"))):
+            shard = {name: np.load(os.path.join(shard_dir, f"{name}.npy"), mmap_mode='r')
+                     for name in SHARD_COLUMNS}
+            self.shards.append(shard)
+            self._starts.append(total)
+            total += len(shard["sent_ptr"]) - 1
+        self._total = total
+
+    def __len__(self):
+        return self._total
+
+    def _locate(self, index):
+        if not 0 <= index < self._total:
+            raise IndexError(index)
+        k = bisect.bisect_right(self._starts, index) - 1
+        return self.shards[k], index - self._starts[k]
+
+    def sentence(self, index):
+        """第 index 句的原文"""
+        shard, i = self._locate(index)
+        offsets = shard["sent_text_offsets"]
+        return bytes(shard["sent_text"][offsets[i]:offsets[i + 1]]).decode('utf-8')
+
+    def __getitem__(self, index):
+        """第 index 句的 DepParse"""
+        shard, i = self._locate(index)
+        start, end = shard["sent_ptr"][i], shard["sent_ptr"][i + 1]
+        offsets = shard["token_offsets"][start:end + 1]
+        data = bytes(shard["text"][offsets[0]:offsets[-1]])
+        words = [data[offsets[j] - offsets[0]:offsets[j + 1] - offsets[0]].decode('utf-8')
+                 for j in range(end - start)]
+        return DepParse(words, shard["heads"][start:end],
+                        [self.rels[r] for r in shard["rel_ids"][start:end]],
+                        [self.pos[p] for p in shard["pos_ids"][start:end]])
+
+
+class ResultWriter:
+    """把每句分析结果同时写入所选的各种格式"""
+
+    def __init__(self, base_path, formats=("conllu",)):
+        os.makedirs(os.path.dirname(base_path) or '.', exist_ok=True)
+        self.paths = []
+        self._writers = []
+        for fmt in formats:
+            if fmt == "conllu":
+                path = base_path + ".conllu"
+                self._writers.append(ConlluWriter(path))
+            elif fmt == "shards":
+                path = base_path + "_shards"
+                self._writers.append(ShardWriter(path))
+            else:
+                raise ValueError(f"未知的输出格式: {fmt}，可选: {', '.join(OUTPUT_FORMATS)}")
+            self.paths.append(path)
+
+    def write(self, sentence, words, pos, arcs):
+        heads, rels = arcs_to_columns(len(words), arcs)
+        for writer in self._writers:
+            writer.write(sentence, words, pos, heads, rels)
+
+    def close(self):
+        for writer in self._writers:
+            writer.close()
+        print(f"结果已保存到 {', '.join(self.paths)}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
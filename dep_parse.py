@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import threading
+
+import numpy as np
+
+
+class Vocab:
+    """标签字符串与整数 id 的双向映射（驻留），可在多个线程中同时使用"""
+
+    def __init__(self):
+        self._ids = {}
+        self._labels = []
+        self._lock = threading.Lock()
+
+    def intern(self, label):
+        label_id = self._ids.get(label)
+        if label_id is None:
+            # 只有新标签才加锁：分配 id 与追加标签必须一起完成
+            with self._lock:
+                label_id = self._ids.get(label)
+                if label_id is None:
+                    self._labels.append(label)
+                    label_id = self._ids[label] = len(self._labels) - 1
+        return label_id
+
+    def intern_all(self, labels):
+        return np.fromiter((self.intern(label) for label in labels), dtype=np.int32)
+
+    def label(self, label_id):
+        return self._labels[label_id]
+
+    def __len__(self):
+        return len(self._labels)
+
+
+# 所有解析器共用的依存关系和词性词表
+REL_VOCAB = Vocab()
+POS_VOCAB = Vocab()
+
+
+class DepParse:
+    """列式依存分析结果
+
+    词语拼接在一个字符串中，offsets 给出每个词的起止位置；heads、rel_ids、pos_ids 为 int32 数组；
+    词的编号从 1 开始，0 表示 ROOT；children 用 CSR 格式存储，child_ptr 长度为 n+2，节点 h（0..n）
+    的子节点为 child_idx[child_ptr[h]:child_ptr[h+1]]，按编号升序排列
+    """
+
+    __slots__ = ("text", "offsets", "heads", "rel_ids", "pos_ids", "child_ptr", "child_idx")
+
+    def __init__(self, words, heads, rels, pos=None):
+        words = list(words)
+        n = len(words)
+        self.text = ''.join(words)
+        self.offsets = np.zeros(n + 1, dtype=np.int32)
+        np.cumsum([len(w) for w in words], out=self.offsets[1:])
+        self.heads = np.asarray(heads, dtype=np.int32)
+        self.rel_ids = REL_VOCAB.intern_all(rels)
+        self.pos_ids = POS_VOCAB.intern_all(pos if pos is not None else [''] * n)
+        if len(self.heads) != n or len(self.rel_ids) != n or len(self.pos_ids) != n:
+            raise ValueError(f"词语、核心词、依存关系和词性的数量不一致: {n}")
+
+        # 稳定排序后同一核心词的子节点相邻且按编号升序
+        order = np.argsort(self.heads, kind='stable')
+        counts = np.bincount(self.heads, minlength=n + 1)
+        self.child_ptr = np.zeros(n + 2, dtype=np.int32)
+        np.cumsum(counts, out=self.child_ptr[1:])
+        self.child_idx = (order + 1).astype(np.int32)
+
+    def __len__(self):
+        return len(self.heads)
+
+    def word(self, i):
+        """第 i 个词（从 1 开始）"""
+        return self.text[self.offsets[i - 1]:self.offsets[i]]
+
+    def words(self):
+        return [self.word(i) for i in range(1, len(self) + 1)]
+
+    def head(self, i):
+        return int(self.heads[i - 1])
+
+    def rel(self, i):
+        return REL_VOCAB.label(self.rel_ids[i - 1])
+
+    def pos(self, i):
+        return POS_VOCAB.label(self.pos_ids[i - 1])
+
+    def children(self, i):
+        """节点 i 的子节点编号数组，i=0 时返回根节点，O(1)"""
+        return self.child_idx[self.child_ptr[i]:self.child_ptr[i + 1]]
+
+    def roots(self):
+        return self.children(0)
+
+    def to_arcs(self):
+        """转换为 (核心词, 依存关系, 依存词) 元组列表"""
+        return [(self.head(i), self.rel(i), i) for i in range(1, len(self) + 1)]
+
+
+def from_arcs(words, arcs, pos=None):
+    """(核心词, 依存关系, 依存词) 元组列表，如 syntactic_zh / syntactic_en 的 dep 结果"""
+    heads = [0] * len(words)
+    rels = [''] * len(words)
+    for head, rel, dep in arcs:
+        heads[dep - 1] = head
+        rels[dep - 1] = rel
+    return DepParse(words, heads, rels, pos)
+
+
+def from_stanza_document(doc):
+    """Stanza 的 Document 对象，多个句子拼接为一个 DepParse，核心词编号按句子偏移，每句的根挂在 0 上"""
+    words, heads, rels, pos = [], [], [], []
+    for sentence in doc.sentences:
+        offset = len(words)
+        for w in sentence.words:
+            words.append(w.text)
+            heads.append(w.head + offset if w.head else 0)
+            rels.append(w.deprel)
+            pos.append(w.pos)
+    return DepParse(words, heads, rels, pos)
+
+
+def from_conll(conll):
+    """CoNLL 文本（如 HanLP.parseDependency 的结果），取 ID、词、词性、核心词、依存关系列"""
+    words, heads, rels, pos = [], [], [], []
+    for line in str(conll).split('\n'):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        parts = line.split()
+        if len(parts) >= 8:
+            words.append(parts[1])
+            pos.append(parts[3])
+            heads.append(int(parts[6]))
+            rels.append(parts[7])
+    return DepParse(words, heads, rels, pos)
+
+
+def iter_preorder(parse, root):
+    """迭代先序遍历，产出 (节点, 深度)；子节点按编号升序，不受递归深度限制，O(n)"""
+    seen = bytearray(len(parse) + 1)
+    stack = [(root, 0)]
+    while stack:
+        node, depth = stack.pop()
+        if seen[node]:
+            continue
+        seen[node] = 1
+        yield node, depth
+        for child in parse.children(node)[::-1]:
+            stack.append((int(child), depth + 1))
+
+
+def subtree_nodes(parse, node):
+    """以 node 为根的子树中所有节点，按句中顺序排列"""
+    return sorted(n for n, _ in iter_preorder(parse, node))
+
+
+def phrase(parse, node):
+    """按句中顺序拼接子树中的词，得到完整短语"""
+    return ''.join(parse.word(i) for i in subtree_nodes(parse, node))
+
+
+def from_hanlp(sentence):
+    """HanLP.parseDependency 返回的 CoNLLSentence 对象，直接读取 CoNLLWord 字段，不经过字符串"""
+    words = list(sentence.getWordArray())
+    return DepParse([str(w.LEMMA) for w in words], [int(w.HEAD.ID) for w in words],
+                    [str(w.DEPREL) for w in words], [str(w.CPOSTAG) for w in words])
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# deferred: 分析结束后并行渲染；none: 只保存依存树，需要时再用本脚本渲染
+RENDER_MODES = ("deferred", "none")
+# 分析阶段输出的紧凑依存树文件名
+TREES_FILE = "dep_trees.jsonl"
+# 每个渲染进程最多积压的任务数（限制内存）
+PENDING_PER_WORKER = 4
+
+
+class TreeWriter:
+    """分析阶段把依存树逐行写入 JSONL：{"idx", "words", "arcs"}"""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def write(self, sentence_idx, words, arcs):
+        record = {"idx": sentence_idx, "words": list(words), "arcs": [list(arc) for arc in arcs]}
+        self._file.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n")
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_trees(path, only=None):
+    """读取依存树文件，only 为句子编号集合时只返回这些句子"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            tree = json.loads(line)
+            if only is None or tree["idx"] in only:
+                yield tree
+
+
+def build_digraph(words, arcs, sentence_idx, fontname, fmt='png'):
+    """构建依存关系的 Graphviz 图"""
+    from graphviz import Digraph
+
+    dot = Digraph(name=f"sentence_{sentence_idx}", format=fmt)
+
+    # 设置图形属性，包括中文字体
+    dot.attr(rankdir='TB')  # 从上到下的布局
+    dot.attr('graph', fontname=fontname)
+    dot.attr('node', fontname=fontname)
+    dot.attr('edge', fontname=fontname)
+
+    for i, word in enumerate(words):
+        dot.node(str(i+1), f"{word}\n(ID:{i+1})", shape='box', style='filled', color='lightblue')
+
+    dot.node('0', 'ROOT', shape='ellipse', style='filled', color='lightgreen')
+
+    for head_idx, rel, dep_idx in arcs:
+        dot.edge(str(head_idx), str(dep_idx), label=rel)
+
+    return dot
+
+
+def render_tree(tree, output_dir, fmt='png', fontname='SimHei'):
+    """渲染一棵依存树，失败时保存 dot 文件以便手动生成"""
+    os.makedirs(output_dir, exist_ok=True)
+    dot = build_digraph(tree["words"], tree["arcs"], tree["idx"], fontname, fmt)
+    output_path = os.path.join(output_dir, f"sentence_{tree['idx']}_dep_tree")
+
+    try:
+        dot.render(output_path, view=False, cleanup=True)
+        print(f"依存关系图已保存至: {output_path}.{fmt}")
+        return f"{output_path}.{fmt}"
+    except Exception as e:
+        print(f"生成可视化图像失败: {e}")
+        print("请确保已安装 Graphviz 软件并将其添加到系统 PATH")
+        dot.save(output_path + '.dot')
+        print(f"已保存 dot 文件: {output_path}.dot")
+        return None
+
+
+def render_trees(trees, output_dir, fmt='png', fontname='SimHei', workers=None):
+    """用进程池并行渲染多棵依存树，返回成功生成的图像数；在途任务数有上限，内存不随句子数增长"""
+    workers = workers or os.cpu_count() or 1
+    rendered = 0
+    pending = deque()
+    with ProcessPoolExecutor(workers) as pool:
+        for tree in trees:
+            pending.append(pool.submit(render_tree, tree, output_dir, fmt, fontname))
+            if len(pending) >= workers * PENDING_PER_WORKER:
+                rendered += bool(pending.popleft().result())
+        while pending:
+            rendered += bool(pending.popleft().result())
+    print(f"共生成 {rendered} 张依存关系图")
+    return rendered
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="按需渲染依存关系树")
+    parser.add_argument("trees", help=f"分析阶段输出的 {TREES_FILE}")
+    parser.add_argument("--output-dir", default=None, help="默认与依存树文件同目录")
+    parser.add_argument("--format", default="png", choices=["png", "svg", "pdf"])
+    parser.add_argument("--font", default="SimHei")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--only", type=int, nargs="+", default=None, help="只渲染指定编号的句子")
+    args = parser.parse_args()
+
+    output_dir = args.output_dir or os.path.dirname(args.trees) or '.'
+    only = set(args.only) if args.only else None
+    render_trees(iter_trees(args.trees, only), output_dir, args.format, args.font, args.workers)
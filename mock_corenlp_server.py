@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import re
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+# 未录制的文本按空白和标点粗略切分
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+SENTENCE_END = {".", "!", "?"}
+
+
+def load_recordings(path):
+    """读取 CoreNLPClient(record_to=...) 录制的 {"text", "response"} JSONL"""
+    recordings = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                recordings[record["text"]] = record["response"]
+    return recordings
+
+
+def synthesize(text):
+    """为未录制的文本生成结构正确的假结果：逐句把每个词挂到前一个词上"""
+    sentences = []
+    tokens = []
+    for word in TOKEN_PATTERN.findall(text):
+        tokens.append(word)
+        if word in SENTENCE_END:
+            sentences.append(tokens)
+            tokens = []
+    if tokens:
+        sentences.append(tokens)
+
+    result = []
+    for index, words in enumerate(sentences):
+        deps = [{"dep": "ROOT", "governor": 0, "governorGloss": "ROOT", "dependent": 1, "dependentGloss": words[0]}]
+        deps += [{"dep": "dep", "governor": i, "governorGloss": words[i - 1],
+                  "dependent": i + 1, "dependentGloss": words[i]} for i in range(1, len(words))]
+        result.append({
+            "index": index,
+            "tokens": [{"index": i + 1, "word": w, "originalText": w, "pos": "NN"} for i, w in enumerate(words)],
+            "basicDependencies": deps,
+        })
+    return {"sentences": result}
+
+
+class MockCoreNLPHandler(BaseHTTPRequestHandler):
+    """模拟 CoreNLP 的 POST /?properties=... 接口"""
+
+    def do_POST(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.requests += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+            busy = server.max_concurrency and server.in_flight > server.max_concurrency
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            text = self.rfile.read(length).decode('utf-8')
+            if busy:
+                # 超过并发上限时返回 503，用于测试客户端的重试与背压
+                self.send_response(503)
+                self.end_headers()
+                return
+            if server.delay:
+                time.sleep(server.delay)
+            response = server.recordings.get(text) or synthesize(text)
+            body = json.dumps(response, ensure_ascii=False).encode('utf-8')
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockCoreNLPServer(socketserver.ThreadingMixIn, HTTPServer):
+    """回放录制结果的本地 CoreNLP 替身，记录请求数和峰值并发"""
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), recordings=None, delay=0.0, max_concurrency=0):
+        super().__init__(address, MockCoreNLPHandler)
+        self.recordings = recordings or {}
+        self.delay = delay
+        self.max_concurrency = max_concurrency
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """在后台线程中运行，返回自身"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="本地模拟 CoreNLP 服务器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--recordings", default=None, help="录制的 JSONL 文件")
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="每个请求的模拟处理时间")
+    parser.add_argument("--max-concurrency", type=int, default=0, help="超过该并发数返回 503，0 表示不限制")
+    args = parser.parse_args()
+
+    recordings = load_recordings(args.recordings) if args.recordings else {}
+    server = MockCoreNLPServer((args.host, args.port), recordings, args.delay_ms / 1000, args.max_concurrency)
+    print(f"模拟 CoreNLP 服务器已启动: {server.url}（已录制 {len(recordings)} 条）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import runpy
+import subprocess
+import sys
+
+# 子命令 → (脚本模块, 说明)；脚本及其依赖的库只在执行对应子命令时导入
+COMMANDS = {
+    "segment": ("segmenter", "流式中文分词（jieba / SnowNLP / THULAC）"),
+    "guwen": ("processing_guwen", "古文分词"),
+    "evaluate": ("seg_evaluation", "分词结果评测"),
+    "benchmark": ("seg_benchmark", "分词速度基准测试"),
+    "serve": ("seg_server", "分词 HTTP 服务"),
+    "syntax-zh": ("syntactic_zh", "中文句法分析（LTP）"),
+    "syntax-en": ("syntactic_en", "英文句法分析（CoreNLP）"),
+    "render": ("dep_render", "按需渲染依存关系树"),
+    "srl": ("semantic_role_annotation", "HanLP 中文语义角色标注"),
+    "stanza": ("semantic_syntatic_analysis", "Stanza 依存分析与可视化"),
+    "sentiment": ("sentiment_analysis", "英文情感分析"),
+    "mock-corenlp": ("mock_corenlp_server", "本地模拟 CoreNLP 服务器"),
+    "prefork": ("prefork", "一次加载模型、多进程共享内存的分词与句法分析"),
+}
+# 只导入脚本时不应被加载的重量级库
+HEAVY_MODULES = ("jieba", "snownlp", "thulac", "ltp", "torch", "stanza", "networkx", "matplotlib",
+                 "graphviz", "pyhanlp", "jpype", "stanfordcorenlp", "textblob")
+# 导入每个脚本允许的最长时间（毫秒）
+STARTUP_BUDGET_MS = 500
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_command(name, argv):
+    """以 __main__ 身份运行子命令对应的脚本，argv 原样交给脚本自己的参数解析"""
+    module = COMMANDS[name][0]
+    sys.argv = [f"{module}.py"] + list(argv)
+    if SCRIPT_DIR not in sys.path:
+        sys.path.insert(0, SCRIPT_DIR)
+    runpy.run_module(module, run_name="__main__", alter_sys=True)
+
+
+def probe_startup(module):
+    """在新的解释器中导入脚本，返回导入耗时和被连带导入的重量级库"""
+    code = (
+        "import json, sys, time\n"
+        "t = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = (time.perf_counter() - t) * 1000\n"
+        f"heavy = sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules)\n"
+        "print(json.dumps({'import_ms': elapsed, 'heavy': heavy}))\n"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], cwd=SCRIPT_DIR, capture_output=True, text=True)
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"退出码 {proc.returncode}"
+        return {"import_ms": None, "heavy": [], "error": error}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def startup_check(names=None, budget_ms=STARTUP_BUDGET_MS, repeat=3):
+    """启动耗时守卫：每个子命令的脚本导入耗时（取最小值）不超过预算，且不导入重量级库
+
+    返回 (结果列表, 是否全部通过)
+    """
+    results = []
+    passed = True
+    for name in names or COMMANDS:
+        module = COMMANDS[name][0]
+        probes = [probe_startup(module) for _ in range(repeat)]
+        errors = [p["error"] for p in probes if p.get("error")]
+        timings = [p["import_ms"] for p in probes if p["import_ms"] is not None]
+        result = {
+            "command": name,
+            "module": module,
+            "import_ms": min(timings) if timings else None,
+            "heavy": probes[0]["heavy"],
+            "error": errors[0] if errors else None,
+        }
+        result["ok"] = (not result["error"] and not result["heavy"]
+                        and result["import_ms"] <= budget_ms)
+        passed = passed and result["ok"]
+        results.append(result)
+    return results, passed
+
+
+def print_startup_report(results, budget_ms):
+    print(f"{'command':<14}{'module':<30}{'import_ms':>10}  status")
+    for r in results:
+        ms = f"{r['import_ms']:.1f}" if r["import_ms"] is not None else "-"
+        if r["error"]:
+            status = f"导入失败: {r['error']}"
+        elif r["heavy"]:
+            status = f"导入了重量级库: {', '.join(r['heavy'])}"
+        elif not r["ok"]:
+            status = f"超过预算 {budget_ms}ms"
+        else:
+            status = "ok"
+        print(f"{r['command']:<14}{r['module']:<30}{ms:>10}  {status}")
+
+
+def main(argv=None):
+    import argparse
+
+    argv = sys.argv[1:] if argv is None else list(argv)
+    commands = "\n".join(f"  {name:<14}{desc}" for name, (_, desc) in COMMANDS.items())
+    parser = argparse.ArgumentParser(
+        usage="%(prog)s command [args ...]",
+        description="NLP 实验统一入口，各子命令按需导入所需的库",
+        epilog=f"子命令:\n{commands}\n  {'startup-check':<14}检查各子命令的启动耗时\n\n"
+               "子命令的参数见: nlp_cli.py <子命令> --help",
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=list(COMMANDS) + ["startup-check"], metavar="command")
+    args = parser.parse_args(argv[:1])
+    rest = argv[1:]
+
+    if args.command != "startup-check":
+        run_command(args.command, rest)
+        return 0
+
+    check = argparse.ArgumentParser(prog="nlp_cli.py startup-check", description="启动耗时守卫")
+    check.add_argument("commands", nargs="*", metavar="command", help="只检查指定的子命令，默认全部")
+    check.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    check.add_argument("--repeat", type=int, default=3)
+    check.add_argument("--output", default=None, help="把结果保存为 JSON")
+    opts = check.parse_args(rest)
+    unknown = [name for name in opts.commands if name not in COMMANDS]
+    if unknown:
+        check.error(f"未知的子命令: {', '.join(unknown)}，可选: {', '.join(COMMANDS)}")
+
+    results, passed = startup_check(opts.commands, opts.budget_ms, opts.repeat)
+    print_startup_report(results, opts.budget_ms)
+    if opts.output:
+        with open(opts.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
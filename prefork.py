@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import gc
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+# 父进程中加载、由 fork 出的工作进程共享的对象（模型、词典等）
+_shared = {}
+
+
+def share(name, obj):
+    """登记一个已加载的对象，必须在创建 PreforkPool 之前调用"""
+    _shared[name] = obj
+    return obj
+
+
+def shared(name):
+    """工作进程中取出父进程登记的对象，无需重新加载"""
+    return _shared[name]
+
+
+def fork_available():
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+def freeze_heap():
+    """回收一次垃圾后把所有存活对象移入永久代
+
+    子进程的垃圾回收不再遍历这些对象、改写它们的 GC 头，模型所在的内存页保持与父进程共享；
+    引用计数的改写无法完全避免，但只影响实际被访问的少量对象
+    """
+    gc.collect()
+    gc.freeze()
+
+
+def _init_child():
+    # PyTorch（LTP）在 fork 后多线程计算容易超额占用 CPU，每个工作进程只用一个线程
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(1)
+
+
+class PreforkPool:
+    """先加载、后 fork 的进程池：工作进程以写时复制方式共享父进程已加载的模型"""
+
+    def __init__(self, workers=None, freeze=True):
+        if not fork_available():
+            raise RuntimeError("当前平台不支持 fork，无法共享已加载的模型")
+        self.workers = workers or os.cpu_count() or 1
+        self._frozen = freeze
+        if freeze:
+            freeze_heap()
+        self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("fork"),
+                                             initializer=_init_child)
+
+    def submit(self, fn, *args):
+        return self._executor.submit(fn, *args)
+
+    def map(self, fn, *iterables, chunksize=1):
+        return self._executor.map(fn, *iterables, chunksize=chunksize)
+
+    def shutdown(self):
+        self._executor.shutdown()
+        if self._frozen:
+            gc.unfreeze()
+            self._frozen = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    # 作为脚本运行时本模块是 __main__，工作进程却通过 import prefork 读取登记表，
+    # 因此登记和建池都必须使用 sys.modules 中真正的 prefork 模块
+    import prefork
+    from segmenter import BACKENDS, CORPORA, get_backend, segment_file
+    from token_filter import DEFAULT_FILTER
+
+    # 与 processing_*.py 一致的词性标注结果过滤方式
+    KEEP_TAGGED = {
+        "snownlp": lambda word: word.strip() != '',
+        "thulac": DEFAULT_FILTER,
+    }
+
+    parser = argparse.ArgumentParser(description="一次加载模型、fork 多个工作进程共享模型内存进行分词和句法分析")
+    parser.add_argument("--backends", nargs="*", choices=sorted(BACKENDS), default=[],
+                        help="对默认语料分词的后端，结果写入 seg_<后端>/")
+    parser.add_argument("--ltp", default=None, metavar="INPUT", help="用 LTP 对该文件做中文句法分析")
+    parser.add_argument("--render", choices=("deferred", "none"), default="deferred",
+                        help="--ltp 分析后的依存树渲染方式（见 dep_render.RENDER_MODES）")
+    parser.add_argument("--workers", type=int, default=0, help="工作进程数，0 表示使用全部 CPU 核")
+    parser.add_argument("--no-freeze", action="store_true", help="fork 前不冻结父进程的对象")
+    args = parser.parse_args()
+    if not args.backends and not args.ltp:
+        parser.error("请至少指定 --backends 或 --ltp")
+
+    # 所有模型都在父进程中加载一次
+    backends = [prefork.share(name, get_backend(name).ensure_loaded()) for name in args.backends]
+    ltp = None
+    if args.ltp:
+        import syntactic_zh
+        ltp = syntactic_zh.load_ltp_model()
+        if not ltp:
+            sys.exit(1)
+        prefork.share("ltp", ltp)
+
+    with prefork.PreforkPool(args.workers or None, freeze=not args.no_freeze) as pool:
+        print(f"已加载 {', '.join(args.backends + (['ltp'] if ltp else []))}，{pool.workers} 个工作进程共享模型")
+        for backend in backends:
+            for filename in CORPORA:
+                segment_file(backend, f"{filename}.txt",
+                             f'seg_{backend.name}/{filename}_filtered.txt',
+                             f'seg_{backend.name}/{filename}_tagged.txt',
+                             keep_tagged=KEEP_TAGGED.get(backend.name), pool=pool)
+            print(f"{backend.name} 分词完成，结果已保存到 seg_{backend.name} 文件夹")
+        if ltp:
+            syntactic_zh.analyze(args.ltp, render=args.render, ltp=ltp, pool=pool)
@@ -1,43 +1,13 @@
-from snownlp import SnowNLP
-import string
+from seg_cache import CachedBackend, SegCache
+from segmenter import CORPORA, get_backend, segment_file
 
-for filenum in range(1, 4):
-    filename = ""
-    if filenum == 1:
-        filename = "01news"
-    elif filenum == 2:
-        filename = "02passage"
-    else:
-        filename = "03poem"
-    
-    # 读取文件
-    filepath = f"{filename}.txt"
-    with open(filepath, 'r', encoding='utf-8') as file:
-        text = file.read()
-    
-    # 初始化SnowNLP对象
-    s = SnowNLP(text)
-    
-    # 分词
-    segmented_text = s.words
-    
-    # 去除中文标点符号
-    filtered_text = [word for word in segmented_text if word not in ['，', '。', '！', '？', '：', '；', '“', '”', '‘', '’', '（', '）', '《', '》', '、','…','—']]
-    
-    # 去除空格与换行符
-    filtered_text = [word for word in filtered_text if word != '' and word != '\n']
-    
-    # 导出分词结果
-    with open(f'seg_snownlp/{filename}_filtered.txt', 'w', encoding='utf-8') as file:
-        for word in filtered_text:
-            file.write(word + ", ")
-    
-    # 词性标注（SnowNLP的tag方法返回词性标注结果）
-    tagged_words = s.tags
-    
-    # 导出标注结果
-    with open(f'seg_snownlp/{filename}_tagged.txt', 'w', encoding='utf-8') as file:
-        for word, flag in tagged_words:
-            # 过滤掉空字符的标注结果
-            if word.strip() not in ['', '\n', '\t']:
-                file.write(f"{word} ({flag})\n")
+with SegCache() as cache:
+    # SnowNLP 后端，未变化的句子直接从缓存读取
+    backend = CachedBackend(get_backend("snownlp"), cache)
+
+    for filename in CORPORA:
+        # 流式分词并导出；标注结果过滤掉空字符
+        segment_file(backend, f"{filename}.txt",
+                     f'seg_snownlp/{filename}_filtered.txt',
+                     f'seg_snownlp/{filename}_tagged.txt',
+                     keep_tagged=lambda word: word.strip() != '')
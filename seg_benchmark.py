@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import math
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import time
+
+from segmenter import BACKENDS, SENTENCE_SPLIT, backend_version, get_backend
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块
+    resource = None
+
+# 基准语料与对应的标准答案名
+BENCH_CORPORA = {"01news": "news", "02passage": "passage", "03poem": "poem", "04guwen": "guwen"}
+
+
+def peak_rss_mb():
+    """当前进程的峰值常驻内存（MB）"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 以字节为单位，Linux 以 KB 为单位
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def load_sentences(corpus, scale=1, seed=0):
+    """读取语料并按句切分，重复 scale 倍后以固定种子打乱，保证多次运行可比"""
+    with open(f"{corpus}.txt", 'r', encoding='utf-8') as f:
+        sentences = [s.strip() for line in f for s in SENTENCE_SPLIT.split(line) if s.strip()]
+    sentences = sentences * scale
+    random.Random(seed).shuffle(sentences)
+    return sentences
+
+
+def percentile(sorted_values, q):
+    """最近秩法求百分位数"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def bench_backend(name, corpora, scale, seed):
+    """在独立进程中测量一个后端：冷启动、吞吐量、逐句延迟和峰值内存
+
+    返回 (逐语料结果, 峰值内存)；峰值内存是整个进程跑完全部语料后的值，属于后端而不是某个语料
+    """
+    backend = get_backend(name)
+    started = time.perf_counter()
+    backend.ensure_loaded()
+    load_seconds = time.perf_counter() - started
+
+    rows = []
+    for corpus in corpora:
+        sentences = load_sentences(corpus, scale, seed)
+        latencies = []
+        tokens = 0
+        for sent in sentences:
+            t0 = time.perf_counter()
+            words = backend.cut(sent)
+            latencies.append(time.perf_counter() - t0)
+            tokens += len(words)
+
+        total = sum(latencies)
+        chars = sum(len(s) for s in sentences)
+        latencies.sort()
+        rows.append({
+            "backend": name,
+            "corpus": corpus,
+            "sentences": len(sentences),
+            "chars": chars,
+            "tokens": tokens,
+            "seconds": total,
+            "chars_per_sec": chars / total if total else 0.0,
+            "tokens_per_sec": tokens / total if total else 0.0,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "load_seconds": load_seconds,
+        })
+
+    return rows, peak_rss_mb()
+
+
+def run_benchmark(backends, corpora, scale=1, seed=0):
+    """逐个后端启动全新进程测量，避免模型常驻内存和缓存互相影响
+
+    返回 (逐语料结果, {后端: 峰值内存 MB})
+    """
+    ctx = multiprocessing.get_context("spawn")
+    rows = []
+    peak_rss = {}
+    for name in backends:
+        with ctx.Pool(1) as pool:
+            backend_rows, peak_rss[name] = pool.apply(bench_backend, (name, corpora, scale, seed))
+        rows.extend(backend_rows)
+    return rows, peak_rss
+
+
+def attach_accuracy(rows):
+    """附上 seg_evaluation 中同一后端、同一语料的 F1，便于对比准确率与速度"""
+    from seg_evaluation import batch_evaluate, discover_results
+
+    f1 = {(r["system"], r["corpus"]): r["f1"] for r in batch_evaluate(discover_results())}
+    for row in rows:
+        row["f1"] = f1.get((row["backend"], BENCH_CORPORA[row["corpus"]]))
+    return rows
+
+
+def environment(backends, scale, seed):
+    """记录运行环境，用于跨次运行比较"""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "scale": scale,
+        "seed": seed,
+        "versions": {name: backend_version(name) for name in backends},
+    }
+
+
+def print_table(rows, peak_rss):
+    print(f"{'后端':<8}{'语料':<10}{'字/秒':>12}{'词/秒':>12}{'p50(ms)':>10}{'p99(ms)':>10}{'加载(s)':>10}")
+    for r in rows:
+        print(f"{r['backend']:<10}{r['corpus']:<12}{r['chars_per_sec']:>12.0f}{r['tokens_per_sec']:>12.0f}"
+              f"{r['p50_ms']:>10.3f}{r['p99_ms']:>10.3f}{r['load_seconds']:>10.2f}")
+    print(f"\n{'后端':<8}{'峰值内存(MB)':>14}")
+    for name, rss in peak_rss.items():
+        print(f"{name:<10}{f'{rss:.1f}' if rss is not None else '-':>16}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="分词吞吐量基准测试")
+    parser.add_argument("--backends", nargs="+", default=sorted(BACKENDS), choices=sorted(BACKENDS))
+    parser.add_argument("--corpora", nargs="+", default=list(BENCH_CORPORA), choices=list(BENCH_CORPORA))
+    parser.add_argument("--scale", type=int, default=20, help="语料合成放大倍数")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--with-accuracy", action="store_true", help="附上已有分词结果的 F1")
+    parser.add_argument("--output", default=None, help="结果 JSON 文件")
+    args = parser.parse_args()
+
+    rows, peak_rss = run_benchmark(args.backends, args.corpora, args.scale, args.seed)
+    if args.with_accuracy:
+        attach_accuracy(rows)
+    print_table(rows, peak_rss)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"environment": environment(args.backends, args.scale, args.seed), "results": rows,
+                       "peak_rss_mb": peak_rss},
+                      f, ensure_ascii=False, indent=2)
+        print(f"基准测试结果已保存到 {args.output}")
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import re
+import sqlite3
+
+from segmenter import SegBackend
+
+# 默认缓存文件与容量上限
+DEFAULT_CACHE_PATH = "seg_cache.sqlite"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# 超出容量时淘汰到上限的该比例，避免每次写入都触发淘汰
+EVICT_TARGET = 0.9
+# 单条 SQL 中 IN (...) 的最大参数数
+SQL_BATCH = 500
+# 累计的命中记录或未提交写入达到该条数时写回并提交，内存占用与事务大小不随语料增长
+FLUSH_ROWS = 10000
+
+# 缓存粒度：按句末标点和换行切分
+CACHE_SPLIT = re.compile(r'(?<=[。！？；!?;\n])')
+
+
+def sentence_key(sentence):
+    """句子文本的 128 位哈希"""
+    return hashlib.blake2b(sentence.encode('utf-8'), digest_size=16).digest()
+
+
+class SegCache:
+    """基于 SQLite 的分词结果缓存，按最近使用时间和总大小淘汰"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES, flush_rows=FLUSH_ROWS):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS seg_cache ("
+            " ns TEXT NOT NULL, key BLOB NOT NULL, value TEXT NOT NULL,"
+            " size INTEGER NOT NULL, last_used INTEGER NOT NULL,"
+            " PRIMARY KEY (ns, key)) WITHOUT ROWID")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS seg_cache_lru ON seg_cache (last_used)")
+        self.max_bytes = max_bytes
+        self.flush_rows = flush_rows
+        self._tick, self._size = self.conn.execute(
+            "SELECT COALESCE(MAX(last_used), 0), COALESCE(SUM(size), 0) FROM seg_cache").fetchone()
+        # 命中记录延迟到 flush 时批量更新；_pending 为上次提交以来写入的条目数
+        self._hits = []
+        self._pending = 0
+
+    def get_many(self, ns, keys):
+        """批量查询，返回 {key: 结果}"""
+        found = {}
+        keys = list(keys)
+        for i in range(0, len(keys), SQL_BATCH):
+            part = keys[i:i + SQL_BATCH]
+            rows = self.conn.execute(
+                f"SELECT key, value FROM seg_cache WHERE ns = ? AND key IN ({','.join('?' * len(part))})",
+                [ns, *part])
+            for key, value in rows:
+                found[key] = json.loads(value)
+        if found:
+            self._tick += 1
+            self._hits.extend((self._tick, ns, key) for key in found)
+            if len(self._hits) >= self.flush_rows:
+                self.flush()
+        return found
+
+    def put_many(self, ns, items):
+        """批量写入 {key: 结果}"""
+        self._tick += 1
+        rows = []
+        for key, value in items.items():
+            encoded = json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+            size = len(key) + len(encoded.encode('utf-8'))
+            rows.append((ns, key, encoded, size, self._tick))
+            self._size += size
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO seg_cache (ns, key, value, size, last_used) VALUES (?, ?, ?, ?, ?)", rows)
+        self._pending += len(rows)
+        if self._size > self.max_bytes or self._pending >= self.flush_rows:
+            self.flush()
+
+    def flush(self):
+        """写回命中时间并提交，超出容量时淘汰最久未使用的条目"""
+        if self._hits:
+            self.conn.executemany("UPDATE seg_cache SET last_used = ? WHERE ns = ? AND key = ?", self._hits)
+            self._hits = []
+        if self._size > self.max_bytes:
+            self._evict()
+        self.conn.commit()
+        self._pending = 0
+
+    def _evict(self):
+        self._size = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM seg_cache").fetchone()[0]
+        excess = self._size - int(self.max_bytes * EVICT_TARGET)
+        if excess <= 0:
+            return
+        # 同一 tick 可能对应整批条目，只删除按时间顺序走过的这些行，不按 tick 截断
+        freed = 0
+        victims = []
+        for ns, key, size in self.conn.execute("SELECT ns, key, size FROM seg_cache ORDER BY last_used"):
+            victims.append((ns, key))
+            freed += size
+            if freed >= excess:
+                break
+        self.conn.executemany("DELETE FROM seg_cache WHERE ns = ? AND key = ?", victims)
+        self._size -= freed
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CachedBackend(SegBackend):
+    """为分词后端加上逐句缓存：已缓存的句子只需计算一次哈希"""
+
+    def __init__(self, backend, cache):
+        super().__init__(backend.user_dict)
+        self.inner = backend
+        self.cache = cache
+        self.name = backend.name
+
+    def load(self):
+        self.inner.ensure_loaded()
+        self._namespace = self.inner.cache_namespace()
+
+    def cut(self, text):
+        return self._cached(text, "cut", self.inner.cut)
+
+    def tag(self, text):
+        return [tuple(pair) for pair in self._cached(text, "tag", self.inner.tag)]
+
+    def _cached(self, text, op, compute):
+        ns = f"{self._namespace}|{op}"
+        pieces = [piece for piece in CACHE_SPLIT.split(text) if piece]
+        keys = [sentence_key(piece) for piece in pieces]
+        found = self.cache.get_many(ns, set(keys))
+
+        computed = {}
+        result = []
+        for piece, key in zip(pieces, keys):
+            value = found.get(key)
+            if value is None:
+                value = computed.get(key)
+            if value is None:
+                value = computed[key] = list(compute(piece))
+            result.extend(value)
+
+        if computed:
+            self.cache.put_many(ns, computed)
+        return result
@@ -1,51 +1,116 @@
-def read_file(path):
+import csv
+import glob
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+import numpy as np
+
+# 每批合并打分的句子数
+EVAL_BATCH = 4096
+
+# 语料文件前缀与标准答案的对应关系
+GOLD_NAMES = {"01news": "news", "02passage": "passage", "03poem": "poem", "04guwen": "guwen"}
+
+# 分词结果文件名：<语料>[-序号 | _系统名][_filtered].txt
+RESULT_FILE = re.compile(r'^(\d{2}[a-z]+)(?:-(\d+)|_(?!filtered|tagged)([a-z]+))?(?:_filtered)?\.txt$')
+
+REPORT_FIELDS = ["system", "corpus", "file", "C", "E", "M", "precision", "recall", "f1",
+                 "avg_word_len", "seconds"]
+
+
+def iter_sentences(path):
+    """逐行流式读取分词结果，产出词语列表"""
     with open(path, 'r', encoding='utf-8') as f:
-        lines = [line.strip() for line in f if line.strip()]
-        return [line.split(', ') for line in lines]
-    
-def single_evaluation(gold_file, test_file):
-    gold_sentences = read_file(gold_file)
-    test_sentences = read_file(test_file)
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line.split(', ')
+
+
+def _batch_lengths(sentences, sizes):
+    """拼接一批句子的词长，每句末尾补一个填充词使句子占满 sizes 指定的宽度"""
+    lengths = []
+    is_word = []
+    for words, size in zip(sentences, sizes):
+        word_lens = [len(w) for w in words]
+        lengths.extend(word_lens)
+        is_word.extend(n > 0 for n in word_lens)
+        lengths.append(size - sum(word_lens))
+        is_word.append(False)
+    return np.array(lengths, dtype=np.int64), np.array(is_word, dtype=bool)
+
+
+def score_batch(gold_batch, test_batch):
+    """用边界位图与累计偏移量对一批句子计算 C、E、M"""
+    sizes = [max(sum(map(len, g)), sum(map(len, t))) + 1 for g, t in zip(gold_batch, test_batch)]
+    gold_lens, gold_is_word = _batch_lengths(gold_batch, sizes)
+    test_lens, test_is_word = _batch_lengths(test_batch, sizes)
+
+    # 标准答案的词边界位图及其前缀和
+    gold_ends = np.cumsum(gold_lens)
+    boundary = np.zeros(gold_ends[-1] + 1, dtype=np.int64)
+    boundary[0] = 1
+    boundary[gold_ends] = 1
+    boundary_count = np.cumsum(boundary)
+
+    # 测试词 [start, end) 正确当且仅当两端都是标准边界且中间没有其他边界
+    test_ends = np.cumsum(test_lens)[test_is_word]
+    test_starts = test_ends - test_lens[test_is_word]
+    correct = (boundary[test_starts] == 1) & (boundary[test_ends] == 1) \
+        & (boundary_count[test_ends] - boundary_count[test_starts] == 1)
+
+    C = int(np.count_nonzero(correct))
+    E = len(test_ends) - C
+    M = int(np.count_nonzero(gold_is_word)) - C
+    return C, E, M
+
+
+def score_sentences(gold_sentences, test_sentences, batch_size=EVAL_BATCH):
+    """对两组按行对应的分词结果打分，返回 C、E、M 和平均词长"""
+    pairs = zip(gold_sentences, test_sentences)
 
     C = E = M = 0
-    total_gold_spans = 0
     total_len = 0
     total_words = 0
 
-    for gold, test in zip(gold_sentences, test_sentences):
-        total_len += sum(len(w) for w in test)
-        total_words += len(test)
-
-        def to_spans(words):
-            spans = []
-            start = 0
-            for w in words:
-                end = start + len(w)
-                spans.append((start, end, w))
-                start = end
-            return spans
-
-        gold_spans = set((s, e) for s, e, _ in to_spans(gold))
-        test_spans = set((s, e) for s, e, _ in to_spans(test))
-
-        C += len(gold_spans & test_spans)
-        E += len(test_spans - gold_spans)
-        M += len(gold_spans - test_spans)
-        
-        total_gold_spans += len(gold_spans)
-        
+    while True:
+        batch = list(islice(pairs, batch_size))
+        if not batch:
+            break
+        gold_batch, test_batch = zip(*batch)
+
+        for test in test_batch:
+            total_len += sum(len(w) for w in test)
+            total_words += len(test)
+
+        c, e, m = score_batch(gold_batch, test_batch)
+        C += c
+        E += e
+        M += m
+
     avg_word_len = total_len / total_words if total_words > 0 else 0
-    
+
     return C, E, M, avg_word_len
 
-def evaluate(file_type, file_path, seg_method):
-    gold_file = f"{prefix_path}seg_gold_answer/{file_type}_answer.txt"
-    test_file = f"{prefix_path}{file_path}"
-    C, E, M, avg_len = single_evaluation(gold_file, test_file)
-    
+
+def single_evaluation(gold_file, test_file, batch_size=EVAL_BATCH):
+    return score_sentences(iter_sentences(gold_file), iter_sentences(test_file), batch_size)
+
+
+def prf(C, E, M):
+    """由 C、E、M 计算正确率、召回率和 F1"""
     precision = C / (C + E) if (C + E) > 0 else 0
     recall = C / (C + M) if (C + M) > 0 else 0
     f1 = 2 * precision * recall / (precision + recall) if (precision + recall) > 0 else 0
+    return precision, recall, f1
+
+
+def print_scores(file_type, seg_method, C, E, M, avg_len):
+    precision, recall, f1 = prf(C, E, M)
 
     print(f"\n{seg_method}对{file_type}的分词结果评价: ")
     print(f"正确分词数 C: {C}")
@@ -56,50 +121,84 @@ def evaluate(file_type, file_path, seg_method):
     print(f"F1值: {f1:.2%}")
     print(f"平均词长: {avg_len:.2f}")
 
+
+def evaluate(file_type, file_path, seg_method, prefix_path=""):
+    gold_file = f"{prefix_path}seg_gold_answer/{file_type}_answer.txt"
+    test_file = f"{prefix_path}{file_path}"
+    C, E, M, avg_len = single_evaluation(gold_file, test_file)
+    print_scores(file_type, seg_method, C, E, M, avg_len)
+
+
+def discover_results(prefix_path=""):
+    """在 seg_* 目录下查找所有分词结果，返回 (系统名, 语料, 文件路径) 列表"""
+    jobs = []
+    for directory in sorted(glob.glob(os.path.join(prefix_path, "seg_*"))):
+        dir_system = os.path.basename(directory)[len("seg_"):]
+        if dir_system == "gold_answer" or not os.path.isdir(directory):
+            continue
+        for path in sorted(glob.glob(os.path.join(directory, "*.txt"))):
+            match = RESULT_FILE.match(os.path.basename(path))
+            if not match or match.group(1) not in GOLD_NAMES:
+                continue
+            corpus, run, system = match.groups()
+            if run:
+                system = f"{dir_system}-{run}"
+            jobs.append((system or dir_system, GOLD_NAMES[corpus], path))
+    return jobs
+
+
+def _score_job(gold_sentences, system, corpus, path):
+    started = time.perf_counter()
+    C, E, M, avg_len = score_sentences(gold_sentences, iter_sentences(path))
+    precision, recall, f1 = prf(C, E, M)
+    return {
+        "system": system, "corpus": corpus, "file": path,
+        "C": C, "E": E, "M": M,
+        "precision": precision, "recall": recall, "f1": f1,
+        "avg_word_len": avg_len,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def batch_evaluate(jobs, prefix_path="", workers=None):
+    """批量评价：每个标准答案只读取一次，所有系统并发打分"""
+    by_gold = {}
+    for system, corpus, path in jobs:
+        by_gold.setdefault(corpus, []).append((system, path))
+
+    futures = []
+    with ThreadPoolExecutor(workers) as pool:
+        for corpus, systems in by_gold.items():
+            gold_sentences = list(iter_sentences(f"{prefix_path}seg_gold_answer/{corpus}_answer.txt"))
+            for system, path in systems:
+                futures.append(pool.submit(_score_job, gold_sentences, system, corpus, path))
+    return [future.result() for future in futures]
+
+
+def save_report(rows, output_file):
+    """按扩展名保存为 JSON 或 CSV 结果矩阵"""
+    if output_file.endswith(".csv"):
+        with open(output_file, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+    print(f"评价结果已保存到 {output_file}")
+
 if __name__ == "__main__":
-    prefix_path = ""
-    
-    # jieba
-    evaluate("news", "seg_jieba/01news_filtered.txt", "jieba")
-    evaluate("passage", "seg_jieba/02passage_filtered.txt", "jieba")
-    evaluate("poem", "seg_jieba/03poem_filtered.txt", "jieba")
-    
-    # snownlp
-    evaluate("news", "seg_snownlp/01news_filtered.txt", "snownlp")
-    evaluate("passage", "seg_snownlp/02passage_filtered.txt", "snownlp")
-    evaluate("poem", "seg_snownlp/03poem_filtered.txt", "snownlp")
-    
-    # thulac
-    evaluate("news", "seg_thulac/01news_filtered.txt", "thulac")
-    evaluate("passage", "seg_thulac/02passage_filtered.txt", "thulac")
-    evaluate("poem", "seg_thulac/03poem_filtered.txt", "thulac")
-    
-    # guwen - xunzi
-    xunzi = 1
-    
-    print("\n\nXunzi - ", xunzi)
-    xunzi += 1
-    evaluate("guwen", "seg_xunzi/04guwen-1.txt", "xunzi")
-    
-    print("\n\nXunzi - ", xunzi)
-    xunzi += 1
-    evaluate("guwen", "seg_xunzi/04guwen-2.txt", "xunzi")
-    
-    print("\n\nXunzi - ", xunzi)
-    xunzi += 1
-    evaluate("guwen", "seg_xunzi/04guwen-3.txt", "xunzi")
-    
-    print("\n\nXunzi - ", xunzi)
-    xunzi += 1
-    evaluate("guwen", "seg_xunzi/04guwen-4.txt", "xunzi")
-    
-    print("\n\nXunzi - ", xunzi)
-    xunzi += 1
-    evaluate("guwen", "seg_xunzi/04guwen-5.txt", "xunzi")
-    print("\n")
-    
-    # guwen - others
-    
-    evaluate("guwen", "seg_xunzi/04guwen_jieba.txt", "jieba")
-    evaluate("guwen", "seg_xunzi/04guwen_snownlp.txt", "snownlp")
-    evaluate("guwen", "seg_xunzi/04guwen_thulac.txt", "thulac")
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="分词结果批量评价")
+    parser.add_argument("--prefix", default="", help="项目根目录前缀")
+    parser.add_argument("--report", default=None, help="结果矩阵输出文件（.json 或 .csv）")
+    parser.add_argument("--workers", type=int, default=None, help="并发打分线程数")
+    args = parser.parse_args()
+
+    rows = batch_evaluate(discover_results(args.prefix), args.prefix, args.workers)
+    for row in rows:
+        print_scores(row["corpus"], row["system"], row["C"], row["E"], row["M"], row["avg_word_len"])
+
+    if args.report:
+        save_report(rows, args.report)
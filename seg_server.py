@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from segmenter import BACKENDS, get_backend
+from token_filter import DEFAULT_FILTER
+
+# 微批参数：最多合并的请求数与最长等待时间
+MAX_BATCH = 64
+MAX_WAIT = 0.005
+
+
+class MicroBatcher:
+    """每个后端一个工作线程：合并并发的小请求为微批，模型常驻内存"""
+
+    def __init__(self, backend, max_batch=MAX_BATCH, max_wait=MAX_WAIT):
+        self.backend = backend.ensure_loaded()
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=f"batcher-{backend.name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, text):
+        """提交一段文本，返回 (词语, 词性) 列表的 Future"""
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            texts = [text for text, _ in batch]
+            try:
+                results = self.backend.tag_batch(texts)
+            except Exception:
+                # 微批失败时逐条重试，只让出错的请求收到异常，不影响同批的其他客户端
+                for text, future in batch:
+                    try:
+                        future.set_result(self.backend.tag(text))
+                    except Exception as e:
+                        future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+
+class SegRequestHandler(BaseHTTPRequestHandler):
+    """POST /segment {"backend": "jieba", "texts": [...], "filter": false}；GET /health"""
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok", "backends": sorted(self.server.batchers)})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/segment":
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(request, dict):
+                raise ValueError("请求体必须是 JSON 对象")
+            batcher = self.server.batchers[request.get("backend", self.server.default_backend)]
+            texts = request["texts"] if "texts" in request else [request["text"]]
+            if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                raise ValueError("text 必须是字符串，texts 必须是字符串列表")
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {"error": f"请求格式错误: {e}"})
+            return
+
+        futures = [batcher.submit(text) for text in texts]
+        try:
+            tagged = [future.result() for future in futures]
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+            return
+
+        # 分词结果与标注结果都来自同一次标注
+        keep = DEFAULT_FILTER if request.get("filter") else None
+        results = [{
+            "words": [word for word, _ in pairs if keep is None or keep(word)],
+            "tags": [[word, flag] for word, flag in pairs],
+        } for pairs in tagged]
+        self._send_json(200, {"results": results})
+
+    def address_string(self):
+        # Unix 套接字没有客户端地址
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class SegHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+if hasattr(socketserver, "UnixStreamServer"):
+    class SegUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+
+def create_server(backends, host="127.0.0.1", port=8765, unix_socket=None,
+                  max_batch=MAX_BATCH, max_wait=MAX_WAIT, quiet=False):
+    """启动时加载全部后端，返回可 serve_forever 的服务器"""
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.remove(unix_socket)
+        server = SegUnixServer(unix_socket, SegRequestHandler)
+    else:
+        server = SegHTTPServer((host, port), SegRequestHandler)
+    server.batchers = {name: MicroBatcher(get_backend(name), max_batch, max_wait) for name in backends}
+    server.default_backend = backends[0]
+    server.quiet = quiet
+    return server
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="常驻分词服务")
+    parser.add_argument("--backends", nargs="+", default=["jieba"], choices=sorted(BACKENDS))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="监听 Unix 套接字而非 TCP 端口")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT * 1000)
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    server = create_server(args.backends, args.host, args.port, args.unix,
+                           args.max_batch, args.max_wait_ms / 1000, args.quiet)
+    print(f"分词服务已启动（{', '.join(args.backends)}）: {args.unix or f'http://{args.host}:{args.port}'}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import hashlib
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from token_filter import DEFAULT_FILTER, TokenFilter, load_stopwords
+
+# 默认处理的语料
+CORPORA = ("01news", "02passage", "03poem")
+
+# 每个文本块的最大字符数（在句末标点处切分，保证不切断句子）
+DEFAULT_CHUNK_CHARS = 4096
+# 每次写盘合并的条目数
+WRITE_BATCH = 1024
+# 并行模式下每个工作进程最多积压的文本块数
+PENDING_PER_WORKER = 4
+
+# 在句末标点之后切分
+SENTENCE_SPLIT = re.compile(r'(?<=[。！？；!?;])')
+# 按块读取文件时在句末标点或换行之后切分
+PIECE_SPLIT = re.compile(r'(?<=[。！？；!?;\n])')
+
+
+class SegBackend:
+    """分词后端基类：子类实现 load / cut / tag"""
+    name = ""
+
+    def __init__(self, user_dict=None):
+        self.user_dict = user_dict
+        self._loaded = False
+
+    def ensure_loaded(self):
+        """首次使用时加载模型或词典"""
+        if not self._loaded:
+            self.load()
+            self._loaded = True
+        return self
+
+    def load(self):
+        pass
+
+    def cut(self, text):
+        """返回词语列表"""
+        raise NotImplementedError
+
+    def tag(self, text):
+        """返回 (词语, 词性) 列表"""
+        raise NotImplementedError
+
+    def tag_batch(self, texts):
+        """批量标注，返回与 texts 一一对应的结果"""
+        return [self.tag(text) for text in texts]
+
+    def version(self):
+        """分词库的版本号"""
+        return backend_version(self.name)
+
+    def cache_namespace(self):
+        """缓存命名空间：后端、版本与用户词典内容共同决定分词结果"""
+        return f"{self.name}|{self.version()}|{file_digest(self.user_dict) if self.user_dict else ''}"
+
+
+class JiebaBackend(SegBackend):
+    name = "jieba"
+
+    def load(self):
+        import jieba
+        import jieba.posseg as pseg
+        jieba.initialize()
+        if self.user_dict:
+            jieba.load_userdict(self.user_dict)
+        self._jieba = jieba
+        self._pseg = pseg
+
+    def cut(self, text):
+        return self._jieba.lcut(text)
+
+    def tag(self, text):
+        return [(w.word, w.flag) for w in self._pseg.cut(text)]
+
+    def tag_batch(self, texts):
+        # jieba 按行独立切分，不含换行的短文本可以用换行拼接后一次标注
+        if len(texts) < 2 or any('\n' in text for text in texts):
+            return super().tag_batch(texts)
+        results = [[]]
+        for pair in self.tag('\n'.join(texts)):
+            if pair[0] == '\n':
+                results.append([])
+            else:
+                results[-1].append(pair)
+        if len(results) != len(texts):
+            return super().tag_batch(texts)
+        return results
+
+
+class SnowNLPBackend(SegBackend):
+    name = "snownlp"
+
+    def __init__(self, user_dict=None):
+        if user_dict:
+            raise ValueError("SnowNLP 不支持用户词典")
+        super().__init__()
+
+    def load(self):
+        from snownlp import SnowNLP
+        self._snownlp = SnowNLP
+
+    def cut(self, text):
+        return self._snownlp(text).words
+
+    def tag(self, text):
+        return list(self._snownlp(text).tags)
+
+
+class ThulacBackend(SegBackend):
+    name = "thulac"
+
+    def load(self):
+        import thulac
+        # seg_only=False表示同时进行分词和词性标注
+        self._thu = thulac.thulac(user_dict=self.user_dict, seg_only=False)
+
+    def cut(self, text):
+        return [word for word, _ in self.tag(text)]
+
+    def tag(self, text):
+        # text=False时返回(词语, 词性)列表，只保留二元组
+        return [tuple(item) for item in self._thu.cut(text, text=False) if len(item) == 2]
+
+
+BACKENDS = {
+    "jieba": JiebaBackend,
+    "snownlp": SnowNLPBackend,
+    "thulac": ThulacBackend,
+}
+
+
+def get_backend(name, user_dict=None):
+    """按名称创建分词后端"""
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"未知的分词后端: {name}，可选: {', '.join(BACKENDS)}")
+    return backend_class(user_dict)
+
+
+def backend_version(name):
+    """读取分词库的版本号"""
+    try:
+        from importlib.metadata import version
+        return version(name)
+    except Exception:
+        return None
+
+
+def file_digest(path):
+    """文件内容的 SHA-1"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _hard_split(piece, max_chars):
+    """没有句末标点的超长片段按 max_chars 强制切开"""
+    for start in range(0, len(piece), max_chars):
+        yield piece[start:start + max_chars]
+
+
+def _split_long_line(line, max_chars):
+    """超长行在句末标点处切开，仍然超长的片段强制切开"""
+    if len(line) <= max_chars:
+        yield line
+        return
+    for piece in SENTENCE_SPLIT.split(line):
+        if piece:
+            yield from _hard_split(piece, max_chars)
+
+
+def iter_chunks(lines, max_chars=DEFAULT_CHUNK_CHARS):
+    """将逐行输入合并为不超过 max_chars 的文本块，块边界尽量在句末或行末"""
+    buf = []
+    size = 0
+    for line in lines:
+        for piece in _split_long_line(line, max_chars):
+            if size and size + len(piece) > max_chars:
+                yield ''.join(buf)
+                buf = []
+                size = 0
+            buf.append(piece)
+            size += len(piece)
+    if buf:
+        yield ''.join(buf)
+
+
+def _iter_file_pieces(f, max_chars):
+    """每次读入 max_chars 个字符，产出以句末标点或换行结尾的片段；
+    末尾未完结的部分留到下一块，超过 max_chars 时强制切开，单行再长也不会整行读入内存"""
+    carry = ''
+    while True:
+        block = f.read(max_chars)
+        if not block:
+            break
+        pieces = PIECE_SPLIT.split(carry + block)
+        carry = pieces.pop()
+        for piece in pieces:
+            yield from _hard_split(piece, max_chars)
+        if len(carry) >= max_chars:
+            yield carry[:max_chars]
+            carry = carry[max_chars:]
+    if carry:
+        yield carry
+
+
+def iter_file_chunks(path, max_chars=DEFAULT_CHUNK_CHARS):
+    """按块流式读取文件并产出文本块，内存占用与文件大小和行长无关"""
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from iter_chunks(_iter_file_pieces(f, max_chars), max_chars)
+
+
+def iter_tokens(backend, chunks):
+    """惰性产出分词结果"""
+    backend.ensure_loaded()
+    for chunk in chunks:
+        yield from backend.cut(chunk)
+
+
+def iter_tagged(backend, chunks):
+    """惰性产出 (词语, 词性)"""
+    backend.ensure_loaded()
+    for chunk in chunks:
+        yield from backend.tag(chunk)
+
+
+# 工作进程内的后端实例（每个进程只初始化一次）
+_worker_backend = None
+
+
+def _init_worker(name, user_dict):
+    """工作进程初始化：加载一次模型/词典"""
+    global _worker_backend
+    _worker_backend = get_backend(name, user_dict).ensure_loaded()
+
+
+def _cut_chunk(chunk):
+    return _worker_backend.cut(chunk)
+
+
+def _tag_chunk(chunk):
+    return _worker_backend.tag(chunk)
+
+
+def _prefork_cut(name, chunk):
+    from prefork import shared
+    return shared(name).cut(chunk)
+
+
+def _prefork_tag(name, chunk):
+    from prefork import shared
+    return shared(name).tag(chunk)
+
+
+def _ordered_map(pool, fn, items, max_pending):
+    """按输入顺序返回结果，同时限制在途任务数以保持内存恒定"""
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def iter_parallel(backend, chunks, workers, tag=False, pool=None):
+    """多进程分词：文本块分发给工作进程，结果按原顺序合并
+
+    pool 为 prefork.PreforkPool 时，工作进程直接使用父进程登记（prefork.share）的后端，不再各自加载
+    """
+    if pool is not None:
+        fn = partial(_prefork_tag if tag else _prefork_cut, backend.name)
+        for result in _ordered_map(pool, fn, chunks, pool.workers * PENDING_PER_WORKER):
+            yield from result
+        return
+
+    workers = workers or os.cpu_count() or 1
+    fn = _tag_chunk if tag else _cut_chunk
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(backend.name, backend.user_dict)) as pool:
+        for result in _ordered_map(pool, fn, chunks, workers * PENDING_PER_WORKER):
+            yield from result
+
+
+class BatchWriter:
+    """将字符串条目分批合并后写入文件"""
+
+    def __init__(self, path, batch_size=WRITE_BATCH):
+        self._file = open(path, 'w', encoding='utf-8')
+        self._batch = []
+        self._batch_size = batch_size
+
+    def write(self, item):
+        self._batch.append(item)
+        if len(self._batch) >= self._batch_size:
+            self.flush()
+
+    def flush(self):
+        if self._batch:
+            self._file.write(''.join(self._batch))
+            self._batch.clear()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_batched(path, items, batch_size=WRITE_BATCH):
+    """将字符串条目分批写入文件"""
+    with BatchWriter(path, batch_size) as writer:
+        for item in items:
+            writer.write(item)
+
+
+def segment_file(backend, src, filtered_path, tagged_path=None, keep_tagged=None,
+                 max_chars=DEFAULT_CHUNK_CHARS, workers=1, token_filter=DEFAULT_FILTER, pool=None):
+    """流式分词一个文件，导出过滤后的分词结果和词性标注结果
+
+    需要标注结果时每个文本块只调用一次标注器，分词结果与标注结果都由它导出；
+    token_filter 决定哪些词写入分词结果；
+    workers 不为 1 时使用多进程并行（None 表示使用全部 CPU 核）；
+    pool 为 prefork.PreforkPool 时在其中并行，共享父进程已加载的后端
+    """
+    chunks = iter_file_chunks(src, max_chars)
+    if pool is not None:
+        workers = pool.workers
+
+    if not tagged_path:
+        if workers == 1:
+            tokens = iter_tokens(backend, chunks)
+        else:
+            tokens = iter_parallel(backend, chunks, workers, pool=pool)
+        write_batched(filtered_path, (w + ", " for w in tokens if token_filter(w)))
+        return
+
+    if workers == 1:
+        tagged = iter_tagged(backend, chunks)
+    else:
+        tagged = iter_parallel(backend, chunks, workers, tag=True, pool=pool)
+
+    with BatchWriter(filtered_path) as filtered_out, BatchWriter(tagged_path) as tagged_out:
+        for word, flag in tagged:
+            if token_filter(word):
+                filtered_out.write(word + ", ")
+            if keep_tagged is None or keep_tagged(word):
+                tagged_out.write(f"{word} ({flag})\n")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="流式中文分词")
+    parser.add_argument("backend", choices=sorted(BACKENDS))
+    parser.add_argument("input")
+    parser.add_argument("filtered")
+    parser.add_argument("--tagged", default=None)
+    parser.add_argument("--chunk-chars", type=int, default=DEFAULT_CHUNK_CHARS)
+    parser.add_argument("--workers", type=int, default=1, help="工作进程数，0 表示使用全部 CPU 核")
+    parser.add_argument("--stopwords", default=None, help="停用词表文件（每行一个词）")
+    parser.add_argument("--unicode-punct", action="store_true", help="按 Unicode 类别识别所有标点")
+    parser.add_argument("--user-dict", default=None, help="用户词典（jieba / THULAC）")
+    parser.add_argument("--cache", default=None, help="分词结果缓存文件（SQLite），仅支持单进程")
+    parser.add_argument("--prefork", action="store_true",
+                        help="多进程时先在父进程加载模型再 fork，工作进程共享模型内存")
+    args = parser.parse_args()
+    if args.cache and args.workers != 1:
+        parser.error("--cache 不能与多进程模式同时使用")
+    if args.prefork and args.workers == 1:
+        parser.error("--prefork 需要与 --workers 一起使用")
+
+    stopwords = load_stopwords(args.stopwords) if args.stopwords else ()
+    token_filter = TokenFilter(stopwords=stopwords, unicode_punct=args.unicode_punct)
+    backend = get_backend(args.backend, args.user_dict)
+
+    cache = None
+    if args.cache:
+        from seg_cache import CachedBackend, SegCache
+        cache = SegCache(args.cache)
+        backend = CachedBackend(backend, cache)
+    pool = None
+    if args.prefork:
+        from prefork import PreforkPool, share
+        share(backend.name, backend.ensure_loaded())
+        pool = PreforkPool(args.workers or None)
+    try:
+        segment_file(backend, args.input, args.filtered, args.tagged,
+                     max_chars=args.chunk_chars, workers=args.workers or None,
+                     token_filter=token_filter, pool=pool)
+    finally:
+        if cache:
+            cache.close()
+        if pool:
+            pool.shutdown()
+    print(f"分词完成，结果已保存到 {args.filtered}")
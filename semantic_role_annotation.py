@@ -1,108 +1,65 @@
-from pyhanlp import HanLP
-import re
+import json
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from itertools import islice
+
+from dep_parse import from_conll, from_hanlp, phrase
+from srl_rules import RoleRules, default_rules
+
+# 文档模式下每批处理的句子数
+BATCH_SIZE = 64
+# HanLP.parseDependency 默认使用的解析器
+PARSER_CLASS = "com.hankcs.hanlp.dependency.nnparser.NeuralNetworkDependencyParser"
+# 预热用的句子，让每个解析器实例提前加载模型并完成 JIT
+WARMUP_SENTENCES = ["小明用筷子夹了一些面条。", "因为我不知道怎么做，所以我便停了下来。"]
 
 def extract_semantic_roles(conll_sentence):
     """优化的语义角色提取函数，解决成分拼接和标签映射问题"""
-    conll_str = str(conll_sentence)
-    lines = [line.strip() for line in conll_str.split('\n') if line.strip() and not line.startswith('#')]
-    
-    # 存储词语信息：id、词、父节点id、依存关系、词性
-    word_info = []
-    for line in lines:
-        parts = re.split(r'\s+', line)
-        if len(parts) >= 8:
-            word_info.append({
-                'id': parts[0],
-                'word': parts[1],
-                'head_id': parts[6],
-                'deprel': parts[7],
-                'pos': parts[3]  # 词性信息
-            })
-
-    # 识别核心动词（词性为动词且有子节点）
-    core_verbs = {}
-    for info in word_info:
-        if info['pos'].startswith('v'):  # 动词词性判断
-            has_children = any(child['head_id'] == info['id'] for child in word_info)
-            if has_children:
-                core_verbs[info['id']] = info['word']
+    # 一次建立列式依存结构与子节点索引，之后的子节点查找都是 O(1)
+    return roles_from_parse(from_conll(conll_sentence))
 
+def roles_from_parse(parse, rules=None):
+    """从 DepParse 中提取每个核心动词的语义角色，角色标签由 srl_rules 的规则表决定"""
+    rules = rules or default_rules()
     semantic_roles = []
-    for verb_id, verb in core_verbs.items():
-        roles = {'verb': verb, 'arguments': []}
+    for verb_id in range(1, len(parse) + 1):
+        # 识别核心动词（词性为动词且有子节点）
+        if not parse.pos(verb_id).startswith('v') or not len(parse.children(verb_id)):
+            continue
+        roles = {'verb': parse.word(verb_id), 'arguments': []}
         
-        for info in word_info:
-            if info['head_id'] == verb_id:
-                deprel = info['deprel']
-                word = info['word']
-                word_id = info['id']
-
-                # 优化1：精准拼接介词短语（如"在厨房里"而非"正在里"）
-                phrase_components = [word]
-                # 递归查找当前词的所有子节点，构建完整短语
-                def find_children(parent_id):
-                    children = []
-                    for child in word_info:
-                        if child['head_id'] == parent_id and child['id'] != parent_id:
-                            children.append(child['word'])
-                            # 继续查找子节点的子节点
-                            children.extend(find_children(child['id']))
-                    return children
-                
-                # 对介词、副词等需要组合的词进行短语构建
-                if info['pos'] in ['p', 'ad', 'c']:  # 介词、副词、连词
-                    phrase_components.extend(find_children(word_id))
-                full_phrase = ''.join(phrase_components)
-
-                # 优化2：更精细的语义角色标签映射
-                role_label = ""
-                if deprel == '主谓关系':
-                    role_label = 'A0 (施事：动作执行者)'
-                elif deprel == '动宾关系':
-                    role_label = 'A1 (受事：动作承受者)'
-                elif deprel == '状中结构':
-                    # 根据完整短语的起始词判断具体角色
-                    if full_phrase.startswith('用'):
-                        role_label = 'AM-INS (工具：使用的物品)'
-                    elif full_phrase.startswith('在'):
-                        role_label = 'AM-LOC (地点：动作发生处)'
-                    elif full_phrase.startswith('因为'):
-                        role_label = 'AM-CAU (原因：动作原因)'
-                    elif full_phrase.startswith('所以'):
-                        role_label = 'AM-RES (结果：动作结果)'
-                    elif full_phrase.startswith('不'):
-                        role_label = 'AM-NEG (否定：动作否定)'
-                    elif full_phrase.startswith('怎么'):
-                        role_label = 'AM-MNR (方式：动作方式)'
-                    elif full_phrase.startswith('正在'):
-                        role_label = 'AM-TMP (时态：进行时)'
-                    else:
-                        role_label = f'AM (附加成分：{full_phrase})'
-                elif deprel == '右附加关系' and word in ['了', '过']:
-                    role_label = 'AM-TMP (时态：完成时标记)'
-                elif deprel == '标点符号':
-                    role_label = 'PUNCT (标点：句子符号)'
-                elif deprel == '并列关系':
-                    role_label = 'COORD (并列：并列动作)'
-                elif deprel == '动补结构':
-                    role_label = 'AM-EXT (补充：动作补充说明)'
-                else:
-                    role_label = f'OTHER (其他：{deprel})'
-
-                roles['arguments'].append((role_label, full_phrase))
+        for word_id in parse.children(verb_id):
+            if word_id == verb_id:
+                continue
+            word = parse.word(word_id)
+
+            # 精准拼接介词短语（如"在厨房里"而非"正在里"）
+            # 对介词、副词等需要组合的词，按句中顺序拼接整棵子树
+            if parse.pos(word_id) in rules.phrase_pos:
+                full_phrase = phrase(parse, word_id)
+            else:
+                full_phrase = word
+
+            role_label = rules.label(parse.rel(word_id), word, full_phrase)
+            roles['arguments'].append((role_label, full_phrase))
         
         semantic_roles.append(roles)
 
     return semantic_roles
 
-def hanlp_srl_analysis(sentence):
+def hanlp_srl_analysis(sentence, rules=None):
     """HanLP中文语义角色标注主函数"""
     print(f"句子：{sentence}")
     print("语义角色标注结果：")
 
+    from pyhanlp import HanLP
+
     # 获取依存分析结果
     conll_result = HanLP.parseDependency(sentence)
-    roles = extract_semantic_roles(conll_result)
+    roles = roles_from_parse(from_hanlp(conll_result), rules)
 
     if not roles:
         print("  未识别到核心动词及语义角色\n")
@@ -115,7 +72,160 @@ def hanlp_srl_analysis(sentence):
             print(f"  {arg_label}：{arg_word}")
     print("\n" + "-"*60 + "\n")
 
+def iter_input_sentences(path):
+    """逐行读取句子（每行一句，跳过空行），path 为 - 时读取标准输入"""
+    f = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8')
+    try:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def _attach_thread_to_jvm():
+    """把当前 Python 线程附着到 JVM（守护线程，不阻止 JVM 退出）"""
+    import jpype
+    if hasattr(jpype.java.lang.Thread, "attachAsDaemon"):
+        jpype.java.lang.Thread.attachAsDaemon()
+    elif not jpype.isThreadAttachedToJVM():
+        jpype.attachThreadToJVM()
+
+class HanLPWorkerPool:
+    """多线程依存分析：每个线程附着到 JVM 并持有自己的解析器实例，句子经有界队列分发"""
+
+    def __init__(self, workers, queue_size=BATCH_SIZE, warmup=WARMUP_SENTENCES):
+        self._tasks = queue.Queue(maxsize=queue_size)
+        self._threads = []
+        self._errors = []
+        ready = threading.Barrier(workers + 1)
+        for i in range(workers):
+            thread = threading.Thread(target=self._run, args=(ready, warmup), name=f"hanlp-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        # 等待所有解析器完成预热；任一线程启动失败时屏障被打破，把它的异常抛给调用方
+        try:
+            ready.wait()
+        except threading.BrokenBarrierError:
+            for thread in self._threads:
+                thread.join()
+            if self._errors:
+                raise self._errors[0]
+            raise
+
+    def _run(self, ready, warmup):
+        try:
+            from pyhanlp import JClass
+
+            _attach_thread_to_jvm()
+            parser = JClass(PARSER_CLASS)()
+            for sent in warmup:
+                parser.parse(sent)
+            ready.wait()
+        except threading.BrokenBarrierError:
+            # 其他线程启动失败，本线程直接退出
+            return
+        except Exception as e:
+            self._errors.append(e)
+            ready.abort()
+            return
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                break
+            sent, future = task
+            try:
+                future.set_result(from_hanlp(parser.parse(sent)))
+            except Exception as e:
+                future.set_exception(e)
+
+    def parse_many(self, sentences):
+        """按输入顺序返回 DepParse 列表；队列满时提交会阻塞（背压）"""
+        futures = []
+        for sent in sentences:
+            future = Future()
+            self._tasks.put((sent, future))
+            futures.append(future)
+        return [future.result() for future in futures]
+
+    def close(self):
+        for _ in self._threads:
+            self._tasks.put(None)
+        for thread in self._threads:
+            thread.join()
+
+def parse_batch(sentences, pool=None):
+    """批量依存分析，直接从 CoNLLSentence 对象构建 DepParse；pool 不为空时多线程并行"""
+    if pool is not None:
+        return pool.parse_many(sentences)
+    from pyhanlp import HanLP
+    return [from_hanlp(HanLP.parseDependency(sent)) for sent in sentences]
+
+def srl_document(sentences, output_file, batch_size=BATCH_SIZE, workers=1, rules=None):
+    """文档级语义角色标注：分批分析，逐句写出 JSONL 角色框架并记录各阶段耗时
+
+    每条记录的 timing_ms 中 extract 是该句角色抽取的实测耗时，parse_batch_avg 是所在批次依存分析耗时的平均值
+    """
+    pool = HanLPWorkerPool(workers, batch_size) if workers > 1 else None
+    totals = {"parse": 0.0, "extract": 0.0, "write": 0.0}
+    count = 0
+    sentences = iter(sentences)
+    try:
+        with open(output_file, 'w', encoding='utf-8') as out:
+            while True:
+                batch = list(islice(sentences, batch_size))
+                if not batch:
+                    break
+
+                t0 = time.perf_counter()
+                parses = parse_batch(batch, pool)
+                t1 = time.perf_counter()
+                # 角色抽取逐句计时；依存分析按批（可能多线程并行）进行，只能给出本批的平均值
+                frames = []
+                extract_ms = []
+                for parse in parses:
+                    start = time.perf_counter()
+                    frames.append(roles_from_parse(parse, rules))
+                    extract_ms.append((time.perf_counter() - start) * 1000)
+                t2 = time.perf_counter()
+                parse_avg_ms = (t1 - t0) * 1000 / len(batch)
+
+                for sent, roles, extract in zip(batch, frames, extract_ms):
+                    count += 1
+                    record = {
+                        "id": count,
+                        "sentence": sent,
+                        "frames": [{"verb": r["verb"],
+                                    "arguments": [{"role": label, "text": text} for label, text in r["arguments"]]}
+                                   for r in roles],
+                        "timing_ms": {"parse_batch_avg": parse_avg_ms, "extract": extract},
+                    }
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                t3 = time.perf_counter()
+
+                totals["parse"] += t1 - t0
+                totals["extract"] += t2 - t1
+                totals["write"] += t3 - t2
+    finally:
+        if pool is not None:
+            pool.close()
+
+    print(f"共标注 {count} 个句子，结果已保存到 {output_file}")
+    for stage, seconds in totals.items():
+        print(f"  {stage}: {seconds:.2f}s")
+    return totals
+
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="HanLP中文语义角色标注")
+    parser.add_argument("--input", default=None, help="每行一句的文本文件（- 表示标准输入），不指定时运行示例句子")
+    parser.add_argument("--output", default="srl_frames.jsonl")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=1, help="并行解析线程数（每个线程一个解析器实例）")
+    parser.add_argument("--rules", nargs="+", default=[], help="追加的领域规则文件（JSON，格式同 srl_rules.json）")
+    args = parser.parse_args()
+
     import warnings
     warnings.filterwarnings("ignore", category=UserWarning, message="A restricted method in java.lang.System has been called")
 
@@ -128,5 +238,9 @@ if __name__ == "__main__":
         "柴犬蹲坐了下来，四处张望，用鼻子嗅着什么。"
     ]
 
-    for sent in test_sentences:
-        hanlp_srl_analysis(sent)
\ No newline at end of file
+    rules = RoleRules.from_files(*args.rules)
+    if args.input:
+        srl_document(iter_input_sentences(args.input), args.output, args.batch_size, args.workers, rules)
+    else:
+        for sent in test_sentences:
+            hanlp_srl_analysis(sent, rules)
\ No newline at end of file
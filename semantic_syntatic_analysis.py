@@ -1,22 +1,40 @@
-import stanza
+import math
 import os
-import networkx as nx
-import matplotlib.pyplot as plt
-import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 
-def load_local_stanza_model(model_dir, lang='en'):
-    """加载本地Stanza模型"""
+# stanza、networkx、matplotlib 在用到时才导入，只做分析或只导出图像时不加载无关的库
+
+# 批量分析时每次交给 Stanza 的句子数
+DOC_BATCH = 256
+# 无界面导出支持的图像格式
+IMAGE_FORMATS = ("png", "svg")
+# 导出图像时每个进程最多积压的任务数（限制内存）
+RENDER_PENDING_PER_WORKER = 4
+
+def load_local_stanza_model(model_dir, lang='en', tokenize_batch_size=None, pos_batch_size=None,
+                            depparse_batch_size=None):
+    """加载本地Stanza模型，可分别设置分词、词性、依存分析的批大小（None 表示使用 Stanza 默认值）"""
     if not os.path.exists(model_dir):
         raise FileNotFoundError(f"模型目录不存在: {model_dir}")
     
+    import stanza
+
     stanza_resource_dir = os.path.abspath(model_dir)
     os.environ['STANZA_RESOURCES_DIR'] = stanza_resource_dir
     
+    batch_sizes = {
+        'tokenize_batch_size': tokenize_batch_size,
+        'pos_batch_size': pos_batch_size,
+        'depparse_batch_size': depparse_batch_size,
+    }
     nlp = stanza.Pipeline(
         lang=lang,
         processors='tokenize,pos,lemma,depparse',
         download_method=None,
-        dir=stanza_resource_dir
+        dir=stanza_resource_dir,
+        **{k: v for k, v in batch_sizes.items() if v is not None}
     )
     
     return nlp
@@ -36,88 +54,210 @@ def analyze_sentence(nlp, sentence):
             })
     return dependencies
 
-def get_tree_structure(dependencies):
-    """构建树形结构，确定每个节点的子节点"""
-    tree = {}
-    root = None
-    
-    # 初始化每个节点的子节点列表
-    for item in dependencies:
-        tree[item["id"]] = []
-    
-    # 构建树结构并找到根节点
-    for item in dependencies:
-        if item["head_id"] == 0:
-            root = item["id"]
+def analyze_sentences(nlp, sentences, doc_batch=DOC_BATCH):
+    """批量分析句子流：每 doc_batch 句作为一组 Document 一次交给 Stanza，
+    逐句按输入顺序产出 (句子, DepParse)，依存数据为列式数组而非逐词字典"""
+    import stanza
+    from dep_parse import from_stanza_document
+
+    sentences = iter(sentences)
+    while True:
+        batch = list(islice(sentences, doc_batch))
+        if not batch:
+            break
+        docs = [stanza.Document([], text=sentence) for sentence in batch]
+        docs = nlp.bulk_process(docs) if hasattr(nlp, 'bulk_process') else nlp(docs)
+        for sentence, doc in zip(batch, docs):
+            yield sentence, from_stanza_document(doc)
+
+def layout_forest(children, roots, level_spacing=2.0, node_spacing=1.5):
+    """非递归树形布局，children 为 {节点: [子节点, ...]}，roots 中的树从左到右依次排列
+
+    先序遍历一次得到访问顺序和深度，逆序累加子树大小（叶子为 1），再先序分配每棵子树的横向起点，
+    最后逆序确定坐标：叶子位于自身宽度的中点，内部节点位于子节点的平均横坐标。
+    roots 无法到达的节点（如成环）依次以编号最小者作为新的根，保证每个节点都有坐标
+    """
+    nodes = list(children)
+    index = {node: i for i, node in enumerate(nodes)}
+    n = len(nodes)
+    seen = bytearray(n)
+    depth = [0] * n
+    kids = [()] * n
+    order = []
+
+    def visit(start):
+        stack = [(index[start], 0)]
+        while stack:
+            i, d = stack.pop()
+            seen[i] = 1
+            depth[i] = d
+            order.append(i)
+            kids[i] = [index[c] for c in children[nodes[i]] if not seen[index[c]]]
+            for k in reversed(kids[i]):
+                stack.append((k, d + 1))
+
+    tree_roots = []
+    for root in roots:
+        if not seen[index[root]]:
+            tree_roots.append(index[root])
+            visit(root)
+    for i in range(n):
+        if not seen[i]:
+            tree_roots.append(i)
+            visit(nodes[i])
+
+    # 后序：子树大小
+    sizes = [1] * n
+    for i in reversed(order):
+        if kids[i]:
+            sizes[i] = sum(sizes[k] for k in kids[i])
+
+    # 先序：每棵子树的横向起点
+    offsets = [0.0] * n
+    x_offset = 0.0
+    for i in tree_roots:
+        offsets[i] = x_offset
+        x_offset += sizes[i] * node_spacing
+    for i in order:
+        x_offset = offsets[i]
+        for k in kids[i]:
+            offsets[k] = x_offset
+            x_offset += sizes[k] * node_spacing
+
+    # 后序：叶子取宽度中点，内部节点取子节点平均位置
+    xs = [0.0] * n
+    for i in reversed(order):
+        if kids[i]:
+            xs[i] = sum(xs[k] for k in kids[i]) / len(kids[i])
         else:
-            tree[item["head_id"]].append((item["id"], item["deprel"]))
-    
-    return tree, root
+            xs[i] = offsets[i] + sizes[i] * node_spacing / 2
+
+    return {nodes[i]: (xs[i], -depth[i] * level_spacing) for i in order}
 
 def assign_tree_positions(tree, root, level_spacing=2.0, node_spacing=1.5):
     """为树节点分配位置，使用改进的树形布局算法防止重叠"""
-    positions = {}
-    
-    # 计算每个节点的子树大小和深度
-    subtree_sizes = {}
-    depths = {}
-    
-    def calculate_subtree_size(node):
-        if node not in subtree_sizes:
-            if not tree[node]:  # 叶子节点
-                subtree_sizes[node] = 1
-                depths[node] = 0
-            else:
-                # 计算所有子节点的子树大小和深度
-                child_sizes = []
-                child_depths = []
-                for child, _ in tree[node]:
-                    calculate_subtree_size(child)
-                    child_sizes.append(subtree_sizes[child])
-                    child_depths.append(depths[child])
-                
-                subtree_sizes[node] = sum(child_sizes)
-                depths[node] = max(child_depths) + 1 if child_depths else 0
-        
-        return subtree_sizes[node]
-    
-    # 计算根节点的子树大小
-    calculate_subtree_size(root)
-    
-    # 分配位置
-    def assign_positions(node, x_offset, y_level):
-        # 计算当前节点的宽度（基于子树大小）
-        width = subtree_sizes[node] * node_spacing
-        
-        if not tree[node]:  # 叶子节点
-            positions[node] = (x_offset + width / 2, -y_level * level_spacing)
-            return x_offset + width
+    children = {node: [child for child, _ in items] for node, items in tree.items()}
+    positions = layout_forest(children, [root], level_spacing, node_spacing)
+    # 与原实现一致，只返回根节点所在的树
+    reachable = set()
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        reachable.add(node)
+        stack.extend(children[node])
+    return {node: pos for node, pos in positions.items() if node in reachable}
+
+def dependencies_from_parse(parse):
+    """DepParse 转换为 analyze_sentence 格式的逐词字典，供可视化使用"""
+    return [{"id": i, "text": parse.word(i), "pos": parse.pos(i), "deprel": parse.rel(i),
+             "head_id": parse.head(i)} for i in range(1, len(parse) + 1)]
+
+def layout_dependencies(dependencies):
+    """计算节点坐标：所有根节点的树从左到右排列；找不到根节点时从编号最小的词开始，结果确定且不依赖 networkx"""
+    children = {item["id"]: [] for item in dependencies}
+    roots = []
+    for item in dependencies:
+        if item["head_id"] == 0:
+            roots.append(item["id"])
         else:
-            # 先处理所有子节点
-            current_x = x_offset
-            child_positions = []
-            
-            for child, _ in tree[node]:
-                child_width = subtree_sizes[child] * node_spacing
-                current_x = assign_positions(child, current_x, y_level + 1)
-                child_positions.append(positions[child])
-            
-            # 当前节点的x位置是子节点位置的中心
-            if child_positions:
-                avg_x = sum(pos[0] for pos in child_positions) / len(child_positions)
-            else:
-                avg_x = x_offset + width / 2
-                
-            positions[node] = (avg_x, -y_level * level_spacing)
-            return x_offset + width
-    
-    # 从根节点开始分配位置
-    assign_positions(root, 0, 0)
-    
-    return positions
+            children[item["head_id"]].append(item["id"])
+    if not roots:
+        print("无法确定根节点，使用默认布局")
+    return layout_forest(children, roots, level_spacing=2.5, node_spacing=2.0)
+
+class TreeCanvas:
+    """无界面绘图：复用同一个 Figure 和 Agg 画布，直接按布局坐标绘制，不经过 pyplot 和 networkx"""
+
+    # 节点半径（磅），对应 networkx 的 node_size=2000
+    NODE_RADIUS = math.sqrt(2000 / math.pi)
+
+    def __init__(self, figsize=(12, 8)):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        self.figure = Figure(figsize=figsize)
+        FigureCanvasAgg(self.figure)
+        # 固定坐标轴区域，省去每张图 tight_layout 的额外绘制
+        self.ax = self.figure.add_axes((0.02, 0.02, 0.96, 0.9))
+
+    def draw(self, dependencies, sentence=None):
+        ax = self.ax
+        ax.clear()
+        pos = layout_dependencies(dependencies)
+
+        # 绘制边和边标签（标签位于靠近依存词 30% 处，与原 networkx 画法一致）
+        for item in dependencies:
+            if item["head_id"] == 0:
+                continue
+            (x1, y1), (x2, y2) = pos[item["head_id"]], pos[item["id"]]
+            ax.annotate("", xy=(x2, y2), xytext=(x1, y1),
+                        arrowprops=dict(arrowstyle='->', mutation_scale=20, lw=1.5, alpha=0.8, color='gray',
+                                        shrinkA=self.NODE_RADIUS, shrinkB=self.NODE_RADIUS))
+            ax.text(x1 * 0.3 + x2 * 0.7, y1 * 0.3 + y2 * 0.7, item["deprel"], fontsize=8,
+                    ha='center', va='center', family='sans-serif',
+                    bbox=dict(boxstyle='round,pad=0.2', facecolor='white', edgecolor='none', alpha=0.7))
+
+        # 绘制节点和节点标签
+        ids = [item["id"] for item in dependencies]
+        ax.scatter([pos[i][0] for i in ids], [pos[i][1] for i in ids], s=2000, c='lightblue',
+                   edgecolors='black', linewidths=1.5, zorder=2)
+        for item in dependencies:
+            x, y = pos[item["id"]]
+            ax.text(x, y, f"{item['text']}\n({item['pos']})", fontsize=10, family='sans-serif',
+                    weight='bold', ha='center', va='center', zorder=3)
+
+        ax.set_title(sentence or "语义依存关系树", fontsize=14, pad=20)
+        ax.margins(0.1)
+        ax.axis('off')
+
+    def save(self, path):
+        """按扩展名保存为 PNG 或 SVG"""
+        self.figure.savefig(path)
+        return path
+
+_worker_canvas = None
+
+def _render_job(job):
+    global _worker_canvas
+    if _worker_canvas is None:
+        _worker_canvas = TreeCanvas()
+    dependencies, sentence, path = job
+    _worker_canvas.draw(dependencies, sentence)
+    return _worker_canvas.save(path)
+
+def render_dependency_trees(items, output_dir, fmt="png", workers=None):
+    """用进程池批量导出依存树图像，items 为 (句子, 逐词字典) 序列，可以是边分析边产出的生成器；
+    在途任务数有上限，内存不随句子数增长；每个进程只创建一个画布"""
+    if fmt not in IMAGE_FORMATS:
+        raise ValueError(f"未知的图像格式: {fmt}，可选: {', '.join(IMAGE_FORMATS)}")
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    jobs = ((deps, sentence, os.path.join(output_dir, f"sentence_{i}_dep_tree.{fmt}"))
+            for i, (sentence, deps) in enumerate(items, 1))
+    rendered = 0
+    pending = deque()
+    with ProcessPoolExecutor(workers) as pool:
+        for job in jobs:
+            pending.append(pool.submit(_render_job, job))
+            if len(pending) >= workers * RENDER_PENDING_PER_WORKER:
+                pending.popleft().result()
+                rendered += 1
+        while pending:
+            pending.popleft().result()
+            rendered += 1
+    print(f"共生成 {rendered} 张依存关系图，保存在 {output_dir}")
+    return rendered
+
+def visualize_dependencies(dependencies, sentence=None, output=None):
+    """使用树形布局可视化依存关系；指定 output 时无界面保存为图像文件，否则弹出窗口显示"""
+    if output:
+        canvas = TreeCanvas()
+        canvas.draw(dependencies, sentence)
+        return canvas.save(output)
+
+    import networkx as nx
+    import matplotlib.pyplot as plt
 
-def visualize_dependencies(dependencies, sentence=None):
-    """使用树形布局可视化依存关系"""
     # 创建有向图
     G = nx.DiGraph()
     
@@ -136,17 +276,10 @@ def visualize_dependencies(dependencies, sentence=None):
             )
             edges.append((item["head_id"], item["id"], item["deprel"]))
     
-    # 获取树形结构
-    tree, root = get_tree_structure(dependencies)
-    if not root:
-        print("无法确定根节点，使用默认布局")
-        pos = nx.spring_layout(G, seed=42, k=2, iterations=50)
-    else:
-        # 使用改进的树形布局
-        pos = assign_tree_positions(tree, root, level_spacing=2.5, node_spacing=2.0)
+    pos = layout_dependencies(dependencies)
     
     # 创建图形
-    plt.figure(figsize=(12, 8))
+    fig = plt.figure(figsize=(12, 8))
     
     # 绘制节点
     nx.draw_networkx_nodes(G, pos, node_size=2000, node_color='lightblue', 
@@ -176,23 +309,83 @@ def visualize_dependencies(dependencies, sentence=None):
     plt.axis('off')
     plt.tight_layout()
     plt.show()
+    # 关闭窗口后释放图形，循环调用时不再泄漏
+    plt.close(fig)
+
+def analyze_file(nlp, input_file, output_base, formats=("conllu",), doc_batch=DOC_BATCH, render_dir=None,
+                 image_format="png", workers=None):
+    """批量分析文件（每行一句），结果写为 CoNLL-U 和/或列式分片，返回句子数；
+    指定 render_dir 时边分析边把每句的依存树交给进程池导出图像"""
+    from dep_io import ResultWriter
+
+    def iter_lines():
+        with open(input_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield line.strip()
+
+    count = 0
+    with ResultWriter(output_base, formats) as writer:
+        def iter_written():
+            nonlocal count
+            for sentence, parse in analyze_sentences(nlp, iter_lines(), doc_batch):
+                writer.write(sentence, parse.words(), [parse.pos(i) for i in range(1, len(parse) + 1)],
+                             parse.to_arcs())
+                count += 1
+                yield sentence, parse
+
+        if render_dir:
+            render_dependency_trees(((sentence, dependencies_from_parse(parse)) for sentence, parse in iter_written()),
+                                    render_dir, image_format, workers)
+        else:
+            for _ in iter_written():
+                pass
+    print(f"共分析 {count} 个句子")
+    return count
 
 if __name__ == "__main__":
-    # 替换为你的模型路径
-    LOCAL_MODEL_DIR = "F:\\LanguageProcessing\\stanza_resources"
-    
+    import argparse
+    from dep_io import OUTPUT_FORMATS
+
+    parser = argparse.ArgumentParser(description="Stanza 依存分析")
+    parser.add_argument("--model-dir", default="F:\\LanguageProcessing\\stanza_resources")
+    parser.add_argument("--input", default=None, help="每行一句的文本文件，不指定时分析并可视化示例句子")
+    parser.add_argument("--output", default=None, help="输出文件前缀，默认与输入文件同名")
+    parser.add_argument("--format", nargs="+", choices=OUTPUT_FORMATS, default=["conllu"])
+    parser.add_argument("--doc-batch", type=int, default=DOC_BATCH, help="每次交给 Stanza 的句子数")
+    parser.add_argument("--tokenize-batch-size", type=int, default=None)
+    parser.add_argument("--pos-batch-size", type=int, default=None)
+    parser.add_argument("--depparse-batch-size", type=int, default=None)
+    parser.add_argument("--render-dir", default=None, help="无界面导出依存树图像的目录，不指定时示例句子弹窗显示")
+    parser.add_argument("--image-format", choices=IMAGE_FORMATS, default="png")
+    parser.add_argument("--workers", type=int, default=None, help="导出图像的进程数")
+    args = parser.parse_args()
+
     try:
-        nlp = load_local_stanza_model(LOCAL_MODEL_DIR, lang='en')
-        test_sentences = [
-            "Alice eats an apple with a fork.",
-            "The quick brown fox jumps over the lazy dog.",
-            "Natural language processing is a subfield of linguistics, computer science, and artificial intelligence."
-        ]
-        
-        for i, sentence in enumerate(test_sentences, 1):
-            print(f"\n===== 分析第 {i} 个句子 =====")
-            deps = analyze_sentence(nlp, sentence)
-            visualize_dependencies(deps, sentence)
+        nlp = load_local_stanza_model(args.model_dir, lang='en',
+                                      tokenize_batch_size=args.tokenize_batch_size,
+                                      pos_batch_size=args.pos_batch_size,
+                                      depparse_batch_size=args.depparse_batch_size)
+        if args.input:
+            output = args.output or os.path.splitext(args.input)[0] + "_stanza"
+            analyze_file(nlp, args.input, output, args.format, args.doc_batch, args.render_dir,
+                         args.image_format, args.workers)
+        else:
+            test_sentences = [
+                "Alice eats an apple with a fork.",
+                "The quick brown fox jumps over the lazy dog.",
+                "Natural language processing is a subfield of linguistics, computer science, and artificial intelligence."
+            ]
+
+            if args.render_dir:
+                os.makedirs(args.render_dir, exist_ok=True)
+            for i, sentence in enumerate(test_sentences, 1):
+                print(f"\n===== 分析第 {i} 个句子 =====")
+                deps = analyze_sentence(nlp, sentence)
+                output = None
+                if args.render_dir:
+                    output = os.path.join(args.render_dir, f"sentence_{i}_dep_tree.{args.image_format}")
+                visualize_dependencies(deps, sentence, output)
             
     except Exception as e:
         print(f"发生错误: {str(e)}")
\ No newline at end of file
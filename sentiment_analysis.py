@@ -1,5 +1,3 @@
-from textblob import TextBlob
-
 def analyze_english_sentiment(text):
     """
     分析英文文本的情感极性和主观性
@@ -10,6 +8,8 @@ def analyze_english_sentiment(text):
     返回:
         dict: 包含极性、主观性和情感判断的字典
     """
+    from textblob import TextBlob
+
     # 创建TextBlob对象
     blob = TextBlob(text)
     
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+
+# 随代码发布的默认规则
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "srl_rules.json")
+# 前缀树中标记词结束的键（不会与单个汉字冲突）
+_END = ""
+
+
+class PrefixTrie:
+    """标记词前缀树：沿短语逐字向下走，返回最长匹配的标签，O(短语长度)"""
+
+    def __init__(self, markers=None):
+        self._root = {}
+        for marker, label in (markers or {}).items():
+            self.add(marker, label)
+
+    def add(self, marker, label):
+        node = self._root
+        for char in marker:
+            node = node.setdefault(char, {})
+        node[_END] = label
+
+    def match(self, text):
+        node = self._root
+        label = None
+        for char in text:
+            node = node.get(char)
+            if node is None:
+                break
+            label = node.get(_END, label)
+        return label
+
+
+def load_rules(paths):
+    """按顺序读取并合并规则文件，后面的文件覆盖或补充前面的同名规则"""
+    rules = {"phrase_pos": [], "deprel": {}, "word": {}, "prefix": {}, "fallback": None}
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        rules["phrase_pos"].extend(data.get("phrase_pos", []))
+        rules["deprel"].update(data.get("deprel", {}))
+        for kind in ("word", "prefix"):
+            for deprel, table in data.get(kind, {}).items():
+                rules[kind].setdefault(deprel, {}).update(table)
+        if data.get("fallback"):
+            rules["fallback"] = data["fallback"]
+    return rules
+
+
+class RoleRules:
+    """编译后的语义角色映射规则
+
+    查找顺序：依存关系 + 词的精确匹配 → 依存关系 + 短语前缀匹配 → 依存关系默认标签 → fallback；
+    标签中可以使用 {phrase}、{word}、{deprel} 占位符
+    """
+
+    def __init__(self, rules):
+        self.phrase_pos = frozenset(rules.get("phrase_pos", []))
+        self._deprel = dict(rules.get("deprel", {}))
+        self._word = {deprel: dict(table) for deprel, table in rules.get("word", {}).items()}
+        self._prefix = {deprel: PrefixTrie(table) for deprel, table in rules.get("prefix", {}).items()}
+        self._fallback = rules.get("fallback") or "OTHER (其他：{deprel})"
+
+    @classmethod
+    def from_files(cls, *extra_paths):
+        """默认规则加上用户的领域规则文件"""
+        return cls(load_rules((DEFAULT_RULES_PATH,) + extra_paths))
+
+    def label(self, deprel, word, phrase):
+        label = None
+        table = self._word.get(deprel)
+        if table is not None:
+            label = table.get(word)
+        if label is None:
+            trie = self._prefix.get(deprel)
+            if trie is not None:
+                label = trie.match(phrase)
+        if label is None:
+            label = self._deprel.get(deprel, self._fallback)
+        if '{' in label:
+            label = label.format(phrase=phrase, word=word, deprel=deprel)
+        return label
+
+
+_default_rules = None
+
+
+def default_rules():
+    """延迟加载并缓存默认规则"""
+    global _default_rules
+    if _default_rules is None:
+        _default_rules = RoleRules.from_files()
+    return _default_rules
@@ -2,20 +2,34 @@
 # -*- coding: utf-8 -*-
 
 import os
-import json
-from stanfordcorenlp import StanfordCoreNLP
-from graphviz import Digraph
+from corenlp_client import CoreNLPClient
+from dep_io import OUTPUT_FORMATS, ResultWriter
+from dep_render import RENDER_MODES, TREES_FILE, TreeWriter, iter_trees, render_trees
 
 # Stanford CoreNLP 路径（请修改为你解压后的目录）
 CORENLP_DIR = r"F:/LanguageProcessing/corenlp_model/stanford-corenlp-4.5.7"
 VISUALIZATION_DIR = "syntactic_en"
+# 一次请求完成分词、分句、词性标注和依存分析
+ANNOTATE_PROPS = {
+    'annotators': 'tokenize,ssplit,pos,depparse',
+    'pipelineLanguage': 'en',
+    'outputFormat': 'json'
+}
+# 每个请求发送的最大字符数（按行切分文档）
+CHUNK_CHARS = 20000
+# 依存树渲染方式（见 dep_render.RENDER_MODES）
+RENDER_MODE = "deferred"
+FONT_NAME = "Arial"
+# 分析结果的输出格式（见 dep_io.OUTPUT_FORMATS）
+OUTPUT_FORMAT = ("conllu",)
 
 # 添加 Graphviz 路径（根据实际安装修改）
 os.environ["PATH"] += os.pathsep + r"D:/SoftwareFiles/Graphviz/bin"
 
 def load_corenlp():
-    """加载 Stanford CoreNLP"""
+    """加载 Stanford CoreNLP（首次使用时才导入）"""
     try:
+        from stanfordcorenlp import StanfordCoreNLP
         nlp = StanfordCoreNLP(CORENLP_DIR, lang='en')
         print("Stanford CoreNLP 加载成功！")
         return nlp
@@ -32,89 +46,87 @@ def read_text_file(file_path):
     print(f"读取文件成功，共 {len(text)} 字符。")
     return text
 
-def segment_sentences(nlp, text):
-    """使用 CoreNLP 分句"""
-    props = {
-        'annotators': 'ssplit',
-        'pipelineLanguage': 'en',
-        'outputFormat': 'json'
-    }
-    ann = nlp.annotate(text, properties=props)
-    ann_json = json.loads(ann)
-    sentences = [ " ".join([token["word"] for token in s["tokens"]]) 
-                  for s in ann_json["sentences"] ]
-    print(f"分句完成，共 {len(sentences)} 个句子。")
-    return sentences
-
-def visualize_dependency_tree(words, arcs, sentence_idx, output_dir):
-    """依存关系可视化"""
-    os.makedirs(output_dir, exist_ok=True)
-    dot = Digraph(name=f"sentence_{sentence_idx}", format='png')
-    dot.attr(rankdir='TB', fontname='Arial')
-
-    for i, word in enumerate(words):
-        dot.node(str(i+1), f"{word}\n(ID:{i+1})", shape='box', style='filled', color='lightblue')
-
-    dot.node('0', 'ROOT', shape='ellipse', style='filled', color='lightgreen')
-
-    for head_idx, rel, dep_idx in arcs:
-        dot.edge(str(head_idx), str(dep_idx), label=rel, fontname='Arial')
-
-    output_path = os.path.join(output_dir, f"sentence_{sentence_idx}_dep_tree")
-    try:
-        dot.render(output_path, view=False, cleanup=True)
-        print(f"依存关系图已保存至: {output_path}.png")
-    except Exception as e:
-        print(f"生成可视化图像失败: {e}")
-        dot.save(output_path + '.dot')
-
-def syntactic_analysis(nlp, sentences):
-    """句法分析：分词、词性、依存"""
-    results = []
-    for i, sent in enumerate(sentences, 1):
-        print(f"\n--- 句子 {i}: {sent} ---")
-        words = nlp.word_tokenize(sent)
-        pos_tags = nlp.pos_tag(sent)
-        dependencies = nlp.dependency_parse(sent)
-
-        dep_result = [(head, rel, dep) for (rel, head, dep) in dependencies]
-
-        print(f"分词: {words}")
-        print(f"词性: {pos_tags}")
-        print(f"依存关系: {dep_result}")
-
-        visualize_dependency_tree(words, dep_result, i, VISUALIZATION_DIR)
-
-        results.append({
-            'sentence': sent,
+def iter_text_chunks(text, max_chars=CHUNK_CHARS):
+    """按行把文档切成不超过 max_chars 的块，每块发送一次请求"""
+    chunk = []
+    size = 0
+    for line in text.splitlines(keepends=True):
+        if size and size + len(line) > max_chars:
+            yield ''.join(chunk)
+            chunk = []
+            size = 0
+        chunk.append(line)
+        size += len(line)
+    if chunk:
+        yield ''.join(chunk)
+
+def parse_annotation(ann_json):
+    """从 CoreNLP 的 JSON 结果中一次性取出每句的分词、词性和依存"""
+    for s in ann_json["sentences"]:
+        words = [token["word"] for token in s["tokens"]]
+        yield {
+            'sentence': " ".join(words),
             'seg': words,
-            'pos': pos_tags,
-            'dep': dep_result
-        })
-    return results
-
-def save_results(results, output_file):
-    """保存结果"""
-    with open(output_file, 'w', encoding='utf-8') as f:
-        for res in results:
-            f.write(f"Sentence: {res['sentence']}\n")
-            f.write(f"Tokens: {' '.join(res['seg'])}\n")
-            f.write(f"POS: {' '.join([p for _, p in res['pos']])}\n")
-            f.write(f"Dependency: {res['dep']}\n\n")
-    print(f"结果已保存到 {output_file}")
-
-def analyze(input_file):
-    nlp = load_corenlp()
-    if not nlp:
-        return
+            'pos': [(token["word"], token["pos"]) for token in s["tokens"]],
+            'dep': [(d["governor"], d["dep"], d["dependent"]) for d in s["basicDependencies"]]
+        }
+
+def annotate_document(client, text, max_chars=CHUNK_CHARS):
+    """每个文档块只请求一次 annotate，多个块并发请求，按原顺序逐句产出分析结果"""
+    for ann_json in client.annotate_many(iter_text_chunks(text, max_chars), ANNOTATE_PROPS):
+        yield from parse_annotation(ann_json)
+
+def syntactic_analysis(parsed_sentences, result_writer, render=RENDER_MODE):
+    """句法分析：分词、词性、依存；结果逐句写出，依存树分析结束后再渲染"""
+    count = 0
+    trees_path = os.path.join(VISUALIZATION_DIR, TREES_FILE)
+    tree_writer = TreeWriter(trees_path)
+    for i, res in enumerate(parsed_sentences, 1):
+        print(f"\n--- 句子 {i}: {res['sentence']} ---")
+        print(f"分词: {res['seg']}")
+        print(f"词性: {res['pos']}")
+        print(f"依存关系: {res['dep']}")
+
+        tree_writer.write(i, res['seg'], res['dep'])
+        result_writer.write(res['sentence'], res['seg'], [p for _, p in res['pos']], res['dep'])
+        count = i
+    tree_writer.close()
+    print(f"\n分析完成，共 {count} 个句子。")
+
+    if render == "deferred":
+        render_trees(iter_trees(trees_path), VISUALIZATION_DIR, fontname=FONT_NAME)
+    else:
+        print(f"依存树已保存到 {trees_path}，可用 dep_render.py 按需渲染")
+    return count
+
+def analyze(input_file, render=RENDER_MODE, server_url=None, formats=OUTPUT_FORMAT):
+    """server_url 为空时启动本地 CoreNLP，否则连接已有服务器（或模拟服务器）"""
+    nlp = None
+    if server_url is None:
+        nlp = load_corenlp()
+        if not nlp:
+            return
+        server_url = nlp.url
     try:
         text = read_text_file(f"{input_file}")
     except FileNotFoundError as e:
         print(e)
         return
-    sentences = segment_sentences(nlp, text)
-    results = syntactic_analysis(nlp, sentences)
-    save_results(results, f"syntactic_en/ana_{input_file}")
+    output_base = os.path.join(VISUALIZATION_DIR, f"ana_{os.path.splitext(os.path.basename(input_file))[0]}")
+    with CoreNLPClient(server_url) as client, ResultWriter(output_base, formats) as result_writer:
+        syntactic_analysis(annotate_document(client, text), result_writer, render)
+    if nlp:
+        nlp.close()
 
 if __name__ == "__main__":
-    analyze("syntactic_en.txt")
+    import argparse
+    parser = argparse.ArgumentParser(description="英文句法分析")
+    parser.add_argument("input", nargs="?", default="syntactic_en.txt")
+    parser.add_argument("--render", choices=RENDER_MODES, default=RENDER_MODE,
+                        help="deferred: 分析后并行渲染；none: 只保存依存树")
+    parser.add_argument("--server", default=None, help="已运行的 CoreNLP 服务器地址，如 http://localhost:9000")
+    parser.add_argument("--format", nargs="+", choices=OUTPUT_FORMATS, default=list(OUTPUT_FORMAT),
+                        help="conllu: CoNLL-U 文本；shards: 可 mmap 的列式分片")
+    args = parser.parse_args()
+
+    analyze(args.input, args.render, args.server, args.format)
@@ -2,19 +2,39 @@
 # -*- coding: utf-8 -*-
 
 import os
-from ltp import LTP
-from graphviz import Digraph
+import re
+from itertools import islice
+from dep_parse import from_arcs, iter_preorder
+from dep_io import OUTPUT_FORMATS, ResultWriter
+from dep_render import RENDER_MODES, TREES_FILE, TreeWriter, iter_trees, render_trees
 
 # 配置
 MODEL_DIR = "F:/LanguageProcessing/ltp_models/tiny"
 VISUALIZATION_DIR = "syntactic_zh"
+# 依存树渲染方式（见 dep_render.RENDER_MODES）
+RENDER_MODE = "deferred"
+FONT_NAME = "SimHei"
+# 分析结果的输出格式（见 dep_io.OUTPUT_FORMATS）
+OUTPUT_FORMAT = ("conllu",)
+# 每批送入LTP的句子数
+BATCH_SIZE = 32
+# 每次读入、按长度排序的窗口包含的批数（限制内存）
+WINDOW_BATCHES = 16
+
+# 分句规则：以句末标点或逗号结尾的片段
+SENTENCE_END = '。？！；,.?!;'
+SENTENCE_END_CHAR = re.compile(f'[{SENTENCE_END}]')
+WHITESPACE = re.compile(r'\s+')
+# 没有句末标点时单句的最大字符数，超出部分强制切开
+MAX_SENTENCE_CHARS = 500
 
 # 添加 Graphviz 路径配置（根据你的实际安装路径修改）
 os.environ["PATH"] += os.pathsep + r"D:/SoftwareFiles/Graphviz/bin"
 
 def load_ltp_model():
-    """加载LTP模型"""
+    """加载LTP模型（首次使用时才导入 ltp 和 PyTorch）"""
     try:
+        from ltp import LTP
         ltp = LTP(MODEL_DIR)
         print("LTP模型加载成功！")
         return ltp
@@ -23,88 +43,98 @@ def load_ltp_model():
         print("请检查PyTorch和LTP安装，或手动下载模型。")
         return None
 
-def read_text_file(file_path):
-    """读取TXT文件内容"""
+def iter_sentences(lines, max_chars=MAX_SENTENCE_CHARS):
+    """基于标点规则流式分句，不调用神经模型；跨行的句子与下一行拼接
+
+    每行只扫描一次，未完结的片段放在缓冲区中不再重复扫描；只有标点的片段被丢弃；
+    缓冲区超过 max_chars 时强制切出一句，没有标点的输入也不会拼成一个巨大的句子
+    """
+    buf = []
+    size = 0
+    for line in lines:
+        line = WHITESPACE.sub('', line)
+        start = 0
+        for match in SENTENCE_END_CHAR.finditer(line):
+            end = match.end()
+            if size or end - start > 1:
+                buf.append(line[start:end])
+                yield ''.join(buf)
+            buf = []
+            size = 0
+            start = end
+        tail = line[start:]
+        if tail:
+            buf.append(tail)
+            size += len(tail)
+            if size > max_chars:
+                text = ''.join(buf)
+                cut = size - size % max_chars if size % max_chars else size - max_chars
+                for i in range(0, cut, max_chars):
+                    yield text[i:i + max_chars]
+                buf = [text[cut:]]
+                size -= cut
+    if size:
+        yield ''.join(buf)
+
+def iter_file_sentences(file_path):
+    """逐行流式读取TXT文件并分句"""
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"文件 {file_path} 不存在！请确保文件在当前目录。")
-    
+
     with open(file_path, 'r', encoding='utf-8') as f:
-        text = f.read().strip()
-    print(f"读取文件成功，共 {len(text)} 字符。")
-    return text
-
-def segment_sentences(ltp, text):
-    """使用LTP进行分句"""
-    # 适配LTP 4.x版本的分句方法
-    outputs = ltp.pipeline([text], tasks=["cws"])
-    words = outputs.cws[0]
-    full_text = ''.join(words)
-    import re
-    pattern = r'([^。？！；,.?!;]*[。？！；,.?!;])'
-    sentences = re.findall(pattern, full_text)
-    sentences = [s.strip() for s in sentences if s.strip() and not re.fullmatch(r'[。？！；,.?!;]+', s.strip())]
-    print(f"分句完成，共 {len(sentences)} 个句子。")
-    return sentences
-
-def visualize_dependency_tree(words, arcs, sentence_idx, output_dir):
-    """使用Graphviz可视化依存关系树"""
-    os.makedirs(output_dir, exist_ok=True)
-    
-    # 创建 Digraph 对象时指定中文字体
-    dot = Digraph(name=f"sentence_{sentence_idx}", format='png')
-    
-    # 设置图形属性，包括中文字体
-    dot.attr(rankdir='TB')  # 从上到下的布局
-    dot.attr('graph', fontname='SimHei')  # 图形字体
-    dot.attr('node', fontname='SimHei')   # 节点字体
-    dot.attr('edge', fontname='SimHei')   # 边字体
-    
-    # 添加节点 - 使用支持中文的字体
-    for i, word in enumerate(words):
-        dot.node(str(i+1), f"{word}\n(ID:{i+1})", 
-                shape='box', 
-                style='filled', 
-                color='lightblue',
-                fontname='SimHei')  # 明确指定节点字体
-    
-    # 添加根节点
-    dot.node('0', 'ROOT', 
-             shape='ellipse', 
-             style='filled', 
-             color='lightgreen',
-             fontname='SimHei')
-    
-    # 添加边 - 确保关系标签也使用中文字体
-    for arc in arcs:
-        head_idx, rel, dep_idx = arc
-        dot.edge(str(head_idx), str(dep_idx), label=rel, fontname='SimHei')
-    
-    output_path = os.path.join(output_dir, f"sentence_{sentence_idx}_dep_tree")
-    
-    try:
-        dot.render(output_path, view=False, cleanup=True)
-        print(f"依存关系图已保存至: {output_path}.png")
-    except Exception as e:
-        print(f"生成可视化图像失败: {e}")
-        print("请确保已安装 Graphviz 软件并将其添加到系统 PATH")
-        # 保存 dot 文件以便手动生成
-        dot.save(output_path + '.dot')
-        print(f"已保存 dot 文件: {output_path}.dot")
-        print("可以使用命令手动生成: dot -Tpng {output_path}.dot -o {output_path}.png")
-
-def syntactic_analysis(ltp, sentences):
-    """进行句法分析：分词、词性标注、依存分析"""
+        yield from iter_sentences(f)
+
+def parse_batch(ltp, texts):
+    """一批句子送入LTP，返回每句的 (分词, 词性, 依存)"""
+    # 分词在这里随词性、依存一起完成，每个字只经过模型一次
+    outputs = ltp.pipeline(texts, tasks=["cws", "pos", "dep"])
     results = []
-    for i, sent in enumerate(sentences, 1):
-        print(f"\n--- 句子 {i}: {sent} ---")
-        
-        # 统一使用pipeline获取分析结果（适配LTP 4.x）
-        outputs = ltp.pipeline([sent], tasks=["cws", "pos", "dep"])
-        seg_result = outputs.cws[0]
-        pos_result = outputs.pos[0]
-        dep_heads = outputs.dep[0]['head']
-        dep_labels = outputs.dep[0]['label']
+    for k in range(len(texts)):
+        seg_result = outputs.cws[k]
+        dep_heads = outputs.dep[k]['head']
+        dep_labels = outputs.dep[k]['label']
         dep_result = [(dep_heads[j], dep_labels[j], j+1) for j in range(len(seg_result))]
+        results.append((seg_result, outputs.pos[k], dep_result))
+    return results
+
+def _prefork_parse(texts):
+    from prefork import shared
+    return parse_batch(shared("ltp"), texts)
+
+def batched_pipeline(ltp, sentences, batch_size=BATCH_SIZE, pool=None):
+    """按窗口读入句子，窗口内按长度排序分桶批量推理（减少padding），按原顺序产出 (句子, 分词, 词性, 依存)
+
+    pool 为 prefork.PreforkPool 时各批并行交给工作进程，它们共享父进程登记（prefork.share）的LTP模型
+    """
+    sentences = iter(sentences)
+    window_batches = max(WINDOW_BATCHES, 2 * pool.workers) if pool else WINDOW_BATCHES
+    while True:
+        window = list(islice(sentences, batch_size * window_batches))
+        if not window:
+            break
+        parsed = [None] * len(window)
+        order = sorted(range(len(window)), key=lambda i: len(window[i]))
+        buckets = [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+        if pool:
+            futures = [pool.submit(_prefork_parse, [window[i] for i in indices]) for indices in buckets]
+            results = (future.result() for future in futures)
+        else:
+            results = (parse_batch(ltp, [window[i] for i in indices]) for indices in buckets)
+        for indices, batch_result in zip(buckets, results):
+            for i, result in zip(indices, batch_result):
+                parsed[i] = result
+        for sent, result in zip(window, parsed):
+            yield (sent, *result)
+
+def syntactic_analysis(ltp, sentences, result_writer, batch_size=BATCH_SIZE, render=RENDER_MODE, pool=None):
+    """进行句法分析：分词、词性标注、依存分析；结果逐句写出，依存树分析结束后再渲染"""
+    count = 0
+    trees_path = os.path.join(VISUALIZATION_DIR, TREES_FILE)
+    tree_writer = TreeWriter(trees_path)
+    # 统一使用pipeline获取分析结果（适配LTP 4.x），分批推理
+    parsed = batched_pipeline(ltp, sentences, batch_size, pool)
+    for i, (sent, seg_result, pos_result, dep_result) in enumerate(parsed, 1):
+        print(f"\n--- 句子 {i}: {sent} ---")
         
         print(f"分词: {seg_result}")
         print(f"词性: {pos_result}")
@@ -113,16 +143,18 @@ def syntactic_analysis(ltp, sentences):
         print("依存树（树状表示）:")
         print_dependency_tree(seg_result, dep_result)
         
-        visualize_dependency_tree(seg_result, dep_result, i, VISUALIZATION_DIR)
-        
-        results.append({
-            'sentence': sent,
-            'seg': seg_result,
-            'pos': pos_result,
-            'dep': dep_result
-        })
+        tree_writer.write(i, seg_result, dep_result)
+        result_writer.write(sent, seg_result, pos_result, dep_result)
+        count = i
+    tree_writer.close()
+    print(f"\n分析完成，共 {count} 个句子。")
     
-    return results
+    if render == "deferred":
+        render_trees(iter_trees(trees_path), VISUALIZATION_DIR, fontname=FONT_NAME)
+    else:
+        print(f"依存树已保存到 {trees_path}，可用 dep_render.py 按需渲染")
+    
+    return count
 
 def print_dependency_tree(words, arcs):
     """打印依存树（仅接收words和arcs两个参数）"""
@@ -132,63 +164,69 @@ def print_dependency_tree(words, arcs):
         print("  无明确根节点")
         return
     
-    def print_tree(node_idx, level=0):
-        word = words[node_idx]
-        head, rel, _ = arcs[node_idx]
+    # 一次建立子节点索引，迭代先序遍历，避免长句递归过深
+    parse = from_arcs(words, arcs)
+    for node, level in iter_preorder(parse, root_idx + 1):
+        head, rel, _ = arcs[node - 1]
         indent = "  " * level
-        print(f"{indent}└── {word} (ID:{node_idx+1}, 依存:{rel}, 首依:{head})")
-        
-        # 递归处理子节点
-        children = [i for i, arc in enumerate(arcs) if arc[0] == node_idx + 1]
-        for child in sorted(children):
-            print_tree(child, level + 1)
-    
-    print_tree(root_idx)
+        print(f"{indent}└── {words[node - 1]} (ID:{node}, 依存:{rel}, 首依:{head})")
     print()
 
-def save_results(results, output_file):
-    """保存结果到文件"""
-    with open(output_file, 'w', encoding='utf-8') as f:
-        for res in results:
-            f.write(f"句子: {res['sentence']}\n")
-            f.write(f"分词: {' '.join(res['seg'])}\n")
-            f.write(f"词性: {' '.join(res['pos'])}\n")
-            f.write(f"依存: {res['dep']}\n\n")
-    print(f"结果已保存到 {output_file}")
-
-def analyze(input_file):
-    """主函数"""
-    ltp = load_ltp_model()
+def analyze(input_file, batch_size=BATCH_SIZE, render=RENDER_MODE, formats=OUTPUT_FORMAT, ltp=None, pool=None):
+    """主函数；ltp 为已加载的模型时直接使用，pool 见 batched_pipeline"""
+    if ltp is None:
+        ltp = load_ltp_model()
     if not ltp:
         return
     
-    try:
-        text = read_text_file(f"{input_file}")
-    except FileNotFoundError as e:
-        print(e)
+    if not os.path.exists(input_file):
+        print(f"文件 {input_file} 不存在！请确保文件在当前目录。")
         return
     
-    sentences = segment_sentences(ltp, text)
-    results = syntactic_analysis(ltp, sentences)
-    save_results(results, f"syntactic_zh/ana_{input_file}")
+    # 规则分句并流式送入模型，不再对整篇文档做一次分词
+    sentences = iter_file_sentences(input_file)
+    output_base = os.path.join(VISUALIZATION_DIR, f"ana_{os.path.splitext(os.path.basename(input_file))[0]}")
+    with ResultWriter(output_base, formats) as result_writer:
+        syntactic_analysis(ltp, sentences, result_writer, batch_size, render, pool)
 
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="中文句法分析")
+    parser.add_argument("input", nargs="?", default="syntactic_zh.txt")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--render", choices=RENDER_MODES, default=RENDER_MODE,
+                        help="deferred: 分析后并行渲染；none: 只保存依存树")
+    parser.add_argument("--format", nargs="+", choices=OUTPUT_FORMATS, default=list(OUTPUT_FORMAT),
+                        help="conllu: CoNLL-U 文本；shards: 可 mmap 的列式分片")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="并行推理的进程数：模型在父进程加载一次，fork 出的工作进程共享模型内存")
+    args = parser.parse_args()
+    
     from ltp import __version__
     print(f"LTP版本: {__version__}")
-    try:
-        import graphviz
-        print(f"Graphviz版本: {graphviz.__version__}")
-    except ImportError:
-        print("请先安装graphviz库: pip install graphviz")
-        print("并安装Graphviz软件: https://graphviz.org/download/")
-    
-    # 检查 Graphviz 是否可用
-    try:
-        import graphviz
-        graphviz.version()
-        print("Graphviz 可执行文件找到，可以生成图像。")
-    except graphviz.ExecutableNotFound:
-        print("警告: 未找到 Graphviz 可执行文件，将只能生成文本结果和 dot 文件。")
-        print("请安装 Graphviz 软件并将其添加到系统 PATH")
+    if args.render != "none":
+        try:
+            import graphviz
+            print(f"Graphviz版本: {graphviz.__version__}")
+        except ImportError:
+            print("请先安装graphviz库: pip install graphviz")
+            print("并安装Graphviz软件: https://graphviz.org/download/")
+        
+        # 检查 Graphviz 是否可用
+        try:
+            import graphviz
+            graphviz.version()
+            print("Graphviz 可执行文件找到，可以生成图像。")
+        except graphviz.ExecutableNotFound:
+            print("警告: 未找到 Graphviz 可执行文件，将只能生成文本结果和 dot 文件。")
+            print("请安装 Graphviz 软件并将其添加到系统 PATH")
     
-    analyze("syntactic_zh.txt")
\ No newline at end of file
+    if args.workers > 1:
+        from prefork import PreforkPool, share
+        ltp = load_ltp_model()
+        if ltp:
+            share("ltp", ltp)
+            with PreforkPool(args.workers) as pool:
+                analyze(args.input, args.batch_size, args.render, args.format, ltp, pool)
+    else:
+        analyze(args.input, args.batch_size, args.render, args.format)
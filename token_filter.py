@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unicodedata
+from functools import lru_cache
+
+# 中文标点符号
+PUNCTUATIONS = frozenset(['，', '。', '！', '？', '：', '；', '“', '”', '‘', '’', '（', '）', '《', '》', '、', '…', '—'])
+
+
+@lru_cache(maxsize=65536)
+def is_unicode_punct(word):
+    """按 Unicode 类别判断：词中每个字符都是标点（P*）"""
+    return all(unicodedata.category(ch).startswith('P') for ch in word)
+
+
+def load_stopwords(path):
+    """读取停用词表（每行一个词）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return frozenset(line.strip() for line in f if line.strip())
+
+
+class TokenFilter:
+    """词语过滤器：去除标点、空白与停用词，每个词 O(1) 判断"""
+
+    def __init__(self, punctuations=PUNCTUATIONS, stopwords=(), unicode_punct=False):
+        self.dropped = frozenset(punctuations) | frozenset(stopwords)
+        self.unicode_punct = unicode_punct
+
+    def __call__(self, word):
+        """保留该词时返回 True"""
+        if not word or word in self.dropped or word.isspace():
+            return False
+        if self.unicode_punct and is_unicode_punct(word):
+            return False
+        return True
+
+    def filter(self, words):
+        """返回过滤后的词语列表"""
+        return [word for word in words if self(word)]
+
+
+# 各分词后端共用的默认过滤器
+DEFAULT_FILTER = TokenFilter()